@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Shared pieces of the settings runners (run_automation.py, batch_api_automation.py):
+output folder naming and running one input folder through a FileProcessor
+"""
+
+import logging
+
+from file_llm_automation import save_summary, json_dumps
+
+log = logging.getLogger("automation")
+
+# Output folder prefix for each dataset parent folder; others are upper-cased
+FOLDER_PREFIXES = {'conversion': 'CO', 'drop_off': 'DO'}
+
+def folder_prefix(parent_folder):
+    """Output folder prefix for a dataset parent folder name (Conversion -> CO, Drop_off -> DO)"""
+    return FOLDER_PREFIXES.get(parent_folder.lower(), parent_folder.upper())
+
+async def run_single_automation(processor, input_path, prompt, output_dir):
+    """Run automation for a single input folder"""
+    log.info(f"Processing: {input_path.name}")
+    log.info("-" * 50)
+    
+    # Create output directory
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Keep a copy of the effective config next to the results for reference
+    # (without the API keys, so result folders can be shared)
+    config = {key: value for key, value in processor.config.items() if not key.endswith('_api_key')}
+    config["output_directory"] = str(output_dir)
+    config_file = output_dir / "config.json"
+    with open(config_file, 'wb') as f:
+        f.write(json_dumps(config, indent=True))
+    
+    # Run the automation
+    try:
+        results = await processor.process_files_async(str(input_path), prompt, str(output_dir))
+        save_summary(results, str(output_dir))
+        log.info(f"[OK] Successfully processed {input_path.name}")
+        return True
+        
+    except Exception as e:
+        log.error(f"[ERROR] Unexpected error processing {input_path.name}: {e}")
+        return False
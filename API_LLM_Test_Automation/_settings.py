@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Shared parser for the KEY=VALUE settings files (settings.txt, batch_api_settings.txt)
+"""
+
+import os
+import re
+import json
+import functools
+from pathlib import Path
+
+# A line that starts a new KEY=VALUE setting (ends a multi-line PROMPT)
+_KEY_RE = re.compile(r'^\s*[A-Z_][A-Z0-9_]*\s*=')
+
+def parse_settings(settings_file):
+    """Read KEY=VALUE settings with multi-line PROMPT support; API_PROMPT is stored as PROMPT"""
+    st = os.stat(settings_file)
+    # Keyed by mtime and size, so an edited file is parsed again
+    return dict(_load_settings(os.path.abspath(settings_file), st.st_mtime_ns, st.st_size))
+
+@functools.lru_cache(maxsize=8)
+def _load_settings(path, mtime_ns, size):
+    """Parsed settings, reusing the sibling .cache.json while the file is unchanged"""
+    cache_file = path + '.cache.json'
+    meta = {"mtime": mtime_ns, "size": size}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get("meta") == meta:
+            return cached["settings"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    
+    settings = _parse_settings_file(path)
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({"meta": meta, "settings": settings}, f)
+    except OSError:
+        # The cache is only an optimisation (e.g. read-only folder)
+        pass
+    return settings
+
+def _parse_settings_file(settings_file):
+    settings = {}
+    lines = iter(Path(settings_file).read_text(encoding='utf-8').splitlines())
+    # A line read past the end of a multi-line PROMPT, handled on the next pass
+    pending = None
+
+    while True:
+        raw = pending if pending is not None else next(lines, None)
+        pending = None
+        if raw is None:
+            break
+        line = raw.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        if '=' in line:
+            key, value = line.split('=', 1)
+            key = key.strip()
+            value = value.strip()
+
+            if key in ['API_PROMPT', 'PROMPT']:
+                prompt_lines = [value]
+                # Collect continuation lines until we hit a line that starts with a key=value pattern
+                for next_line in lines:
+                    if _KEY_RE.match(next_line):
+                        pending = next_line
+                        break
+                    prompt_lines.append(next_line)
+                settings['PROMPT'] = '\n'.join(prompt_lines).strip()
+            else:
+                settings[key] = value
+
+    return settings
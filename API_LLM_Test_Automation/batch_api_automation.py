@@ -5,50 +5,48 @@ Processes multiple subfolders automatically with different API models
 """
 
 import os
-import json
-import subprocess
-import sys
+import asyncio
+import logging
 from pathlib import Path
 from datetime import datetime
 
-def read_settings(settings_file="batch_api_settings.txt"):
-    """Read batch settings from file with multi-line PROMPT support"""
-    settings = {}
-    try:
-        with open(settings_file, 'r', encoding='utf-8') as f:
-            lines = [ln.rstrip('\n') for ln in f]
+from file_llm_automation import FileProcessor, close_shared_clients, start_logging
+from _settings import parse_settings
+from _automation import folder_prefix, run_single_automation
 
-        i = 0
-        while i < len(lines):
-            raw = lines[i]
-            line = raw.strip()
-            i += 1
-            if not line or line.startswith('#'):
-                continue
+log = logging.getLogger("batch_api_automation")
 
-            if '=' in line:
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
+# TOML settings (tomllib is standard from Python 3.11, tomli before that; optional)
+try:
+    import tomllib
+    TOML_AVAILABLE = True
+except ImportError:
+    try:
+        import tomli as tomllib
+        TOML_AVAILABLE = True
+    except ImportError:
+        TOML_AVAILABLE = False
 
-                if key in ['API_PROMPT', 'PROMPT']:
-                    prompt_lines = [value]
-                    # Collect continuation lines until we hit a line that starts with a key=value pattern
-                    while i < len(lines):
-                        next_line = lines[i]
-                        # Check if this line looks like a new setting (KEY=VALUE at start of line)
-                        stripped = next_line.strip()
-                        if stripped and '=' in stripped and not stripped.startswith(' ') and not stripped.startswith('\t') and not stripped.startswith('-') and not stripped.startswith('*'):
-                            # This looks like a new key=value setting, stop collecting
-                            break
-                        else:
-                            # This is part of the prompt, add it
-                            prompt_lines.append(next_line)
-                            i += 1
-                    settings['PROMPT'] = '\n'.join(prompt_lines).strip()
-                else:
-                    settings[key] = value
+DEFAULT_SETTINGS_FILE = "batch_api_settings.toml"
+LEGACY_SETTINGS_FILE = "batch_api_settings.txt"
 
+def read_settings(settings_file=None):
+    """Read batch settings from a TOML file, or from a legacy KEY=VALUE .txt file"""
+    if settings_file is None:
+        settings_file = DEFAULT_SETTINGS_FILE if Path(DEFAULT_SETTINGS_FILE).exists() else LEGACY_SETTINGS_FILE
+    
+    if Path(settings_file).suffix.lower() != '.toml':
+        return read_legacy_settings(settings_file)
+    
+    if not TOML_AVAILABLE:
+        print(f"Error: reading {settings_file} needs Python 3.11+ or the tomli package (pip install tomli)")
+        return None
+    
+    try:
+        with open(settings_file, 'rb') as f:
+            settings = tomllib.load(f)
+        if 'API_PROMPT' in settings:
+            settings['PROMPT'] = settings.pop('API_PROMPT')
         return settings
     except FileNotFoundError:
         print(f"Error: {settings_file} not found!")
@@ -57,6 +55,23 @@ def read_settings(settings_file="batch_api_settings.txt"):
         print(f"Error reading {settings_file}: {str(e)}")
         return None
 
+def read_legacy_settings(settings_file=LEGACY_SETTINGS_FILE):
+    """Read batch settings from KEY=VALUE file with multi-line PROMPT support"""
+    try:
+        return parse_settings(settings_file)
+    except FileNotFoundError:
+        print(f"Error: {settings_file} not found!")
+        return None
+    except Exception as e:
+        print(f"Error reading {settings_file}: {str(e)}")
+        return None
+
+def as_list(value):
+    """Settings lists may be TOML arrays or comma-separated strings"""
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split(',') if item.strip()]
+
 def create_config_for_model(model_name, output_base_dir, api_key_type, api_key_value):
     """Create config.json for specific model"""
     config = {
@@ -67,6 +82,8 @@ def create_config_for_model(model_name, output_base_dir, api_key_type, api_key_v
         "max_tokens": 2000,
         "temperature": 0.7,
         "delay_between_files": 1,
+        "concurrency": 5,
+        "requests_per_minute": 60,
         "openai_api_key": "",
         "anthropic_api_key": ""
     }
@@ -79,50 +96,10 @@ def create_config_for_model(model_name, output_base_dir, api_key_type, api_key_v
     
     return config
 
-def run_single_automation(input_path, model_name, prompt, api_key_type, api_key_value, output_dir):
-    """Run automation for a single input folder"""
-    print(f"Processing: {input_path.name}")
-    print("-" * 50)
-    
-    # Create output directory
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Create config for this model
-    config = create_config_for_model(model_name, str(output_dir), api_key_type, api_key_value)
-    config["output_directory"] = str(output_dir)
-    
-    # Save config
-    config_file = output_dir / "config.json"
-    with open(config_file, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2)
-    
-    # Run the automation
-    try:
-        cmd = [
-            sys.executable,
-            "file_llm_automation.py",
-            "--directory", str(input_path),
-            "--prompt", prompt,
-            "--config", str(config_file)
-        ]
-        
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(f"[OK] Successfully processed {input_path.name}")
-        return True
-        
-    except subprocess.CalledProcessError as e:
-        print(f"[ERROR] Error processing {input_path.name}: {e}")
-        if e.stdout:
-            print(f"STDOUT: {e.stdout}")
-        if e.stderr:
-            print(f"STDERR: {e.stderr}")
-        return False
-    except Exception as e:
-        print(f"[ERROR] Unexpected error processing {input_path.name}: {e}")
-        return False
-
-def batch_process_folders(input_folders, models, prompt, api_key_type, api_key_value, output_base_dir, runs_per_combination, prompt_identifier):
+async def batch_process_folders_async(input_folders, models, prompt, api_key_type, api_key_value, output_base_dir, runs_per_combination, prompt_identifier, parallel_combinations=4):
     """Process all input folders with multiple models"""
+    start_logging()
+    
     # Create output base directory
     output_base_path = Path(output_base_dir)
     output_base_path.mkdir(parents=True, exist_ok=True)
@@ -130,76 +107,89 @@ def batch_process_folders(input_folders, models, prompt, api_key_type, api_key_v
     # Check if input folders exist
     for input_folder in input_folders:
         if not Path(input_folder).exists():
-            print(f"Error: Input folder '{input_folder}' does not exist!")
+            log.error(f"Error: Input folder '{input_folder}' does not exist!")
             return
     
-    print(f"Found {len(input_folders)} input folders to process")
-    print(f"Models to test: {', '.join(models)}")
-    print(f"Runs per combination: {runs_per_combination}")
-    print("=" * 60)
+    log.info(f"Found {len(input_folders)} input folders to process")
+    log.info(f"Models to test: {', '.join(models)}")
+    log.info(f"Runs per combination: {runs_per_combination}")
+    log.info(f"Parallel combinations: {parallel_combinations}")
+    log.info("=" * 60)
     
-    # Process each input folder with each model
-    total_combinations = len(input_folders) * len(models) * runs_per_combination
-    current_combination = 0
-    successful_runs = 0
-    failed_runs = 0
+    # One processor per model, reused for every folder and run
+    processors = {
+        model: FileProcessor(create_config_for_model(model, output_base_dir, api_key_type, api_key_value))
+        for model in models
+    }
     
+    # Build every (run, folder, model) combination up front
+    jobs = []
     for run_num in range(runs_per_combination):
-        print(f"\nRun {run_num + 1}/{runs_per_combination}")
-        print("=" * 60)
-        
         for input_folder in input_folders:
             input_path = Path(input_folder)
             parent_folder = input_path.parent.name  # Conversion or Drop_off
             format_type = input_path.name  # JSON or CSV
             
             # Map parent folder to CO/DO
-            if parent_folder.lower() == 'conversion':
-                prefix = 'CO'
-            elif parent_folder.lower() == 'drop_off':
-                prefix = 'DO'
-            else:
-                prefix = parent_folder.upper()
-            
-            print(f"\nProcessing folder: {prefix}_{format_type}")
-            print("-" * 40)
+            prefix = folder_prefix(parent_folder)
             
             for model in models:
-                current_combination += 1
-                print(f"\nModel {current_combination}/{total_combinations}: {model}")
-                print("-" * 30)
-                
                 # Create output folder for this combination matching local LLM pattern
                 model_name = model.replace(':', '-')
                 # Create proper naming pattern: CO_JSON_ANCHORED_gpt-4o-mini_prompt18_run1
                 output_folder = output_base_path / f"{prefix}_{format_type}_ANCHORED_{model_name}_prompt{prompt_identifier}_run{run_num + 1}"
-                
-                success = run_single_automation(
-                    input_path, 
-                    model, 
-                    prompt, 
-                    api_key_type, 
-                    api_key_value, 
-                    output_folder
-                )
-                
-                if success:
-                    successful_runs += 1
-                else:
-                    failed_runs += 1
+                jobs.append((input_path, model, output_folder))
+    
+    # Combinations are I/O-bound API calls, so they share this event loop instead of
+    # a process pool: no fork/spawn cost and the clients and caches stay shared
+    total_combinations = len(jobs)
+    progress = {"started": 0, "successful": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(max(1, int(parallel_combinations)))
+    
+    async def run_job(input_path, model, output_folder):
+        async with semaphore:
+            progress["started"] += 1
+            log.info(f"\nCombination {progress['started']}/{total_combinations}: {output_folder.name}")
+            log.info("-" * 30)
+            
+            success = await run_single_automation(
+                processors[model],
+                input_path, 
+                prompt, 
+                output_folder
+            )
+            
+            if success:
+                progress["successful"] += 1
+            else:
+                progress["failed"] += 1
+    
+    try:
+        await asyncio.gather(*(run_job(*job) for job in jobs))
+    finally:
+        for processor in processors.values():
+            processor.close()
+        await close_shared_clients()
     
     # Summary
-    print("\n" + "=" * 60)
-    print("BATCH PROCESSING SUMMARY")
-    print("=" * 60)
-    print(f"Total input folders: {len(input_folders)}")
-    print(f"Total models: {len(models)}")
-    print(f"Runs per combination: {runs_per_combination}")
-    print(f"Total combinations: {total_combinations}")
-    print(f"Successful runs: {successful_runs}")
-    print(f"Failed runs: {failed_runs}")
-    print(f"Success rate: {(successful_runs/total_combinations)*100:.1f}%")
-    print(f"Results saved to: {output_base_path}")
+    log.info("\n" + "=" * 60)
+    log.info("BATCH PROCESSING SUMMARY")
+    log.info("=" * 60)
+    log.info(f"Total input folders: {len(input_folders)}")
+    log.info(f"Total models: {len(models)}")
+    log.info(f"Runs per combination: {runs_per_combination}")
+    log.info(f"Total combinations: {total_combinations}")
+    log.info(f"Successful runs: {progress['successful']}")
+    log.info(f"Failed runs: {progress['failed']}")
+    log.info(f"Success rate: {(progress['successful']/total_combinations)*100:.1f}%")
+    log.info(f"Results saved to: {output_base_path}")
+
+def batch_process_folders(input_folders, models, prompt, api_key_type, api_key_value, output_base_dir, runs_per_combination, prompt_identifier, parallel_combinations=4):
+    """Process all input folders with multiple models in a single event loop"""
+    asyncio.run(batch_process_folders_async(
+        input_folders, models, prompt, api_key_type, api_key_value,
+        output_base_dir, runs_per_combination, prompt_identifier, parallel_combinations
+    ))
 
 def main():
     print("Batch API LLM Automation Tool")
@@ -218,27 +208,28 @@ def main():
     api_key_value = settings.get('API_KEY', '')
     output_base_dir = settings.get('OUTPUT_BASE_FOLDER', './batch_results')
     runs_per_combination = int(settings.get('RUNS_PER_COMBINATION', 1))
-    prompt_identifier = settings.get('PROMPT_IDENTIFIER', '19')
+    prompt_identifier = str(settings.get('PROMPT_IDENTIFIER', '19'))
+    parallel_combinations = int(settings.get('PARALLEL_COMBINATIONS', 4))
     
     # Parse input folders and models
-    input_folders = [folder.strip() for folder in input_folders_str.split(',') if folder.strip()]
-    models = [model.strip() for model in models_str.split(',') if model.strip()]
+    input_folders = as_list(input_folders_str)
+    models = as_list(models_str)
     
     # Validate settings
     if not input_folders:
-        print("Error: INPUT_FOLDERS not specified in batch_api_settings.txt")
+        print("Error: INPUT_FOLDERS not specified in the batch settings file")
         return
     
     if not models:
-        print("Error: MODELS not specified in batch_api_settings.txt")
+        print("Error: MODELS not specified in the batch settings file")
         return
     
     if not prompt:
-        print("Error: API_PROMPT not specified in batch_api_settings.txt")
+        print("Error: PROMPT not specified in the batch settings file")
         return
     
     if not api_key_value:
-        print("Error: API_KEY not specified in batch_api_settings.txt")
+        print("Error: API_KEY not specified in the batch settings file")
         return
     
     print(f"Input Folders: {', '.join(input_folders)}")
@@ -246,6 +237,7 @@ def main():
     print(f"API Key Type: {api_key_type}")
     print(f"Output Base Directory: {output_base_dir}")
     print(f"Runs per combination: {runs_per_combination}")
+    print(f"Parallel combinations: {parallel_combinations}")
     print(f"Prompt ID: {prompt_identifier}")
     print(f"Prompt: {prompt[:100]}...")
     print("-" * 40)
@@ -257,7 +249,7 @@ def main():
         return
     
     # Start batch processing
-    batch_process_folders(input_folders, models, prompt, api_key_type, api_key_value, output_base_dir, runs_per_combination, prompt_identifier)
+    batch_process_folders(input_folders, models, prompt, api_key_type, api_key_value, output_base_dir, runs_per_combination, prompt_identifier, parallel_combinations)
 
 if __name__ == "__main__":
     main()
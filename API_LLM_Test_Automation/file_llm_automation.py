@@ -5,10 +5,19 @@ Automatically processes files through LLM models and saves results.
 """
 
 import os
+import sys
 import json
 import time
+import queue
+import atexit
+import asyncio
+import logging
+import logging.handlers
+import hashlib
+import random
+import sqlite3
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 import argparse
 from datetime import datetime
 
@@ -20,51 +29,597 @@ except ImportError:
     OPENAI_AVAILABLE = False
 
 try:
-    from anthropic import Anthropic
+    from anthropic import AsyncAnthropic
+    from anthropic import APIConnectionError as AnthropicConnectionError
     ANTHROPIC_AVAILABLE = True
 except ImportError:
     ANTHROPIC_AVAILABLE = False
 
 try:
-    import requests
-    REQUESTS_AVAILABLE = True
+    import httpx
+    HTTPX_AVAILABLE = True
 except ImportError:
-    REQUESTS_AVAILABLE = False
+    HTTPX_AVAILABLE = False
+
+# HTTP/2 support for httpx (optional)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Fast JSON (optional, falls back to the standard library)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Fast content hashing (optional, falls back to hashlib)
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Async file I/O (optional, falls back to worker threads)
+try:
+    import aiofiles
+    AIOFILES_AVAILABLE = True
+except ImportError:
+    AIOFILES_AVAILABLE = False
+
+# Semantic cache (optional)
+try:
+    import numpy as np
+    import hnswlib
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+def json_dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        option = 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    # Compact separators and raw UTF-8 match orjson's output byte for byte
+    text = json.dumps(obj, indent=2 if indent else None, sort_keys=sort_keys,
+                      separators=None if indent else (',', ':'), ensure_ascii=False)
+    return text.encode('utf-8')
+
+def json_loads(data: Any) -> Any:
+    """Parse JSON from bytes or str, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def content_digest(content: str) -> str:
+    """Hash file content for duplicate detection"""
+    data = content.encode('utf-8', errors='surrogatepass')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+log = logging.getLogger("file_llm_automation")
+_log_listener = None
+
+def start_logging(log_file: Optional[str] = None):
+    """Route log records through a queue so workers never block on console/file writes"""
+    global _log_listener
+    if _log_listener is not None or logging.getLogger().handlers:
+        return
+    
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    
+    # Records are formatted once, on the worker side of the queue
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Flush queued log records and stop the listener thread"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+# Shared clients, reused by every LLMProcessor so connections stay pooled.
+# Plain dicts rather than functools.lru_cache: async clients are bound to the event loop
+# that used them, so close_shared_clients() has to reach every instance to close it and
+# then forget it, and an LRU eviction would drop a client without closing its pool.
+_http_client = None
+_openai_clients: Dict[str, Any] = {}
+_anthropic_clients: Dict[str, Any] = {}
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Get the shared HTTP client used for local (Ollama) requests"""
+    global _http_client
+    if _http_client is None:
+        # HTTP/2 multiplexes concurrent requests over one connection on https endpoints;
+        # plain-http servers (a local Ollama) keep using the pooled HTTP/1.1 connections
+        _http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+            timeout=httpx.Timeout(60.0)
+        )
+    return _http_client
+
+def get_openai_client(api_key: str) -> "openai.AsyncOpenAI":
+    """Get the shared OpenAI client for an API key"""
+    if api_key not in _openai_clients:
+        _openai_clients[api_key] = openai.AsyncOpenAI(api_key=api_key)
+    return _openai_clients[api_key]
+
+def get_anthropic_client(api_key: str) -> "AsyncAnthropic":
+    """Get the shared Anthropic client for an API key"""
+    if api_key not in _anthropic_clients:
+        _anthropic_clients[api_key] = AsyncAnthropic(api_key=api_key)
+    return _anthropic_clients[api_key]
+
+_rate_limiters: Dict[str, "RateLimiter"] = {}
+
+def get_rate_limiter(provider: str, requests_per_minute: float) -> "RateLimiter":
+    """Get the rate limiter shared by every processor that talks to a provider"""
+    if provider not in _rate_limiters:
+        _rate_limiters[provider] = RateLimiter(requests_per_minute)
+    return _rate_limiters[provider]
+
+def get_provider(model: str) -> str:
+    """Map a model name to the provider whose rate limit it counts against"""
+    if model.startswith('gpt'):
+        return 'openai'
+    if model.startswith('claude'):
+        return 'anthropic'
+    if model.startswith('local:'):
+        return 'local'
+    return model
+
+async def close_shared_clients():
+    """Close the shared clients; must run inside the event loop that used them"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    for client in list(_openai_clients.values()) + list(_anthropic_clients.values()):
+        await client.close()
+    _openai_clients.clear()
+    _anthropic_clients.clear()
+    _rate_limiters.clear()
+
+# HTTP statuses worth retrying: rate limits, overload and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504, 529}
+
+def get_status_code(error: Exception) -> Optional[int]:
+    """HTTP status of an SDK or httpx error, if it has one"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed request should be retried"""
+    status = get_status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    if OPENAI_AVAILABLE and isinstance(error, openai.APIConnectionError):
+        return True
+    if ANTHROPIC_AVAILABLE and isinstance(error, AnthropicConnectionError):
+        return True
+    return False
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Seconds from the Retry-After header of a failed request, if present"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+class RateLimiter:
+    """Spaces out request starts so concurrent workers respect a requests-per-minute budget.
+    
+    Also acts as a circuit breaker: pause() holds back every request to the provider,
+    e.g. for the Retry-After period of a 429 response.
+    """
+    
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._lock = None
+    
+    def pause(self, seconds: float):
+        """Hold back all requests for the given number of seconds"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    async def acquire(self):
+        """Wait until the next request slot is free"""
+        while True:
+            wait = self._paused_until - time.monotonic()
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        if not self.interval:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class ResponseCache:
+    """SQLite-backed cache of LLM responses keyed by a hash of the request"""
+    
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT, created_at INTEGER)"
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(model: str, prompt: str, content: str, temperature: float, max_tokens: int) -> str:
+        """Build a stable cache key for a request"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "content": content,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        return hashlib.sha256(json_dumps(payload, sort_keys=True)).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None"""
+        row = self.conn.execute("SELECT response FROM cache WHERE key=?", (key,)).fetchone()
+        if row:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+    
+    def contains(self, key: str) -> bool:
+        """Check for a cached response without touching the hit/miss counters"""
+        return self.conn.execute("SELECT 1 FROM cache WHERE key=?", (key,)).fetchone() is not None
+    
+    def set(self, key: str, response: str):
+        """Store a response"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache (key, response, created_at) VALUES (?, ?, ?)",
+            (key, response, int(time.time()))
+        )
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.close()
+
+class SemanticCache:
+    """Nearest-neighbour cache for near-duplicate inputs, backed by hnswlib and SQLite"""
+    
+    def __init__(self, db_path: str, threshold: float = 0.95,
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        self.threshold = threshold
+        self.encoder = SentenceTransformer(model_name)
+        self.dim = self.encoder.get_sentence_embedding_dimension()
+        self.index_path = f"{db_path}.hnsw"
+        self.hits = 0
+        
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_cache "
+            "(id INTEGER PRIMARY KEY, namespace TEXT, response TEXT, embedding BLOB)"
+        )
+        self.conn.commit()
+        
+        count = self.conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0]
+        capacity = max(1000, count * 2)
+        self.index = hnswlib.Index(space='cosine', dim=self.dim)
+        if os.path.exists(self.index_path):
+            self.index.load_index(self.index_path, max_elements=capacity)
+        if not os.path.exists(self.index_path) or self.index.get_current_count() != count:
+            # Index missing or out of sync with the table - rebuild from stored embeddings
+            self.index = hnswlib.Index(space='cosine', dim=self.dim)
+            self.index.init_index(max_elements=capacity, ef_construction=200, M=16)
+            for row_id, blob in self.conn.execute("SELECT id, embedding FROM semantic_cache"):
+                self.index.add_items(np.frombuffer(blob, dtype=np.float32).reshape(1, -1), [row_id])
+    
+    def embed(self, text: str) -> "np.ndarray":
+        """Embed text into a normalized float32 vector"""
+        return self.embed_batch([text])[0]
+    
+    def embed_batch(self, texts: List[str]) -> "np.ndarray":
+        """Embed many texts in one encoder call"""
+        vectors = self.encoder.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32)
+    
+    def get(self, vector: "np.ndarray", namespace: str) -> Optional[str]:
+        """Return the response of the closest stored input within the similarity threshold"""
+        return self.get_batch(vector.reshape(1, -1), namespace)[0]
+    
+    def get_batch(self, vectors: "np.ndarray", namespace: str) -> List[Optional[str]]:
+        """Look up many vectors with a single knn query"""
+        count = self.index.get_current_count()
+        if not count:
+            return [None] * len(vectors)
+        
+        labels, distances = self.index.knn_query(vectors, k=min(10, count))
+        responses = []
+        for row_labels, row_distances in zip(labels, distances):
+            response = None
+            for label, distance in zip(row_labels, row_distances):
+                if distance > 1 - self.threshold:
+                    break
+                row = self.conn.execute(
+                    "SELECT response FROM semantic_cache WHERE id=? AND namespace=?",
+                    (int(label), namespace)
+                ).fetchone()
+                if row:
+                    self.hits += 1
+                    response = row[0]
+                    break
+            responses.append(response)
+        return responses
+    
+    def set(self, vector: "np.ndarray", namespace: str, response: str):
+        """Store a response together with the embedding of its input"""
+        cursor = self.conn.execute(
+            "INSERT INTO semantic_cache (namespace, response, embedding) VALUES (?, ?, ?)",
+            (namespace, response, vector.tobytes())
+        )
+        self.conn.commit()
+        
+        if self.index.get_current_count() >= self.index.get_max_elements():
+            self.index.resize_index(self.index.get_max_elements() * 2)
+        self.index.add_items(vector.reshape(1, -1), [cursor.lastrowid])
+    
+    def close(self):
+        self.index.save_index(self.index_path)
+        self.conn.close()
 
 class LLMProcessor:
     """Handles different LLM model integrations"""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.openai_client = None
-        self.anthropic_client = None
+        self.limiter = get_rate_limiter(
+            get_provider(config.get('model', '')),
+            get_requests_per_minute(config)
+        )
         
-        # Initialize clients based on available APIs
-        if OPENAI_AVAILABLE and config.get('openai_api_key'):
-            self.openai_client = openai.OpenAI(api_key=config['openai_api_key'])
+        # Only deterministic requests are cached unless explicitly enabled
+        self.cache = None
+        deterministic = config.get('temperature', 0.7) == 0
+        if config.get('use_cache', True) and (deterministic or config.get('cache_nondeterministic', False)):
+            self.cache = ResponseCache(config.get('cache_file', './llm_cache.sqlite'))
         
-        if ANTHROPIC_AVAILABLE and config.get('anthropic_api_key'):
-            self.anthropic_client = Anthropic(api_key=config['anthropic_api_key'])
+        # Semantic cache sits behind the exact cache and catches near-duplicate inputs
+        self.semantic_cache = None
+        if self.cache and config.get('semantic_cache', False):
+            if SEMANTIC_CACHE_AVAILABLE:
+                self.semantic_cache = SemanticCache(
+                    config.get('cache_file', './llm_cache.sqlite'),
+                    threshold=config.get('semantic_cache_threshold', 0.95),
+                    model_name=config.get('semantic_cache_model', 'sentence-transformers/all-MiniLM-L6-v2')
+                )
+            else:
+                print("Warning: semantic_cache requires numpy, hnswlib and sentence-transformers. Semantic cache disabled.")
+        
+        # Filled by prepare_batch: embeddings, semantic hits and near-duplicate groups per cache key
+        self._vectors: Dict[str, Any] = {}
+        self._prefetched: Dict[str, str] = {}
+        self._leaders: Dict[str, str] = {}
+        self._shared: Dict[str, asyncio.Future] = {}
+    
+    def _cache_key(self, content: str, prompt: str, model: str) -> str:
+        return ResponseCache.make_key(
+            model,
+            prompt,
+            content,
+            self.config.get('temperature', 0.7),
+            self.config.get('max_tokens', 2000)
+        )
+    
+    def _namespace(self, model: str) -> str:
+        return f"{model}|{self.config.get('temperature', 0.7)}|{self.config.get('max_tokens', 2000)}"
+    
+    async def prepare_batch(self, contents: List[str], prompt: str, model: str):
+        """Embed and look up a whole batch at once before the per-file calls start.
+        
+        Inputs whose embeddings are near-identical to an earlier input in the same
+        batch are grouped so only the first of them goes to the API.
+        """
+        if not self.semantic_cache or not contents:
+            return
+        
+        # Exact cache hits never reach the semantic cache, so leave them out
+        keyed = [(self._cache_key(content, prompt, model), content) for content in contents]
+        keyed = [(key, content) for key, content in keyed if not self.cache.contains(key)]
+        if not keyed:
+            return
+        keys = [key for key, _ in keyed]
+        contents = [content for _, content in keyed]
+        texts = [f"{prompt}\n\n{content}" for content in contents]
+        vectors = await asyncio.to_thread(self.semantic_cache.embed_batch, texts)
+        hits = self.semantic_cache.get_batch(vectors, self._namespace(model))
+        
+        # Cosine similarity between all inputs (vectors are normalized)
+        similarity = vectors @ vectors.T
+        loop = asyncio.get_running_loop()
+        for i, key in enumerate(keys):
+            self._vectors[key] = vectors[i]
+            if hits[i] is not None:
+                self._prefetched[key] = hits[i]
+                continue
+            earlier = np.nonzero(similarity[i, :i] >= self.semantic_cache.threshold)[0]
+            for j in earlier:
+                leader = self._leaders.get(keys[j], keys[j])
+                if leader != key and leader not in self._prefetched:
+                    self._leaders[key] = leader
+                    # Keep an existing future: another batch running concurrently may be waiting on it
+                    if leader not in self._shared:
+                        self._shared[leader] = loop.create_future()
+                    break
+    
+    @property
+    def openai_client(self):
+        """Shared OpenAI client for the configured key, if available"""
+        if OPENAI_AVAILABLE and self.config.get('openai_api_key'):
+            return get_openai_client(self.config['openai_api_key'])
+        return None
+    
+    @property
+    def anthropic_client(self):
+        """Shared Anthropic client for the configured key, if available"""
+        if ANTHROPIC_AVAILABLE and self.config.get('anthropic_api_key'):
+            return get_anthropic_client(self.config['anthropic_api_key'])
+        return None
     
-    def process_with_llm(self, content: str, prompt: str, model: str) -> str:
-        """Process content with specified LLM model"""
+    async def process_with_llm(self, content: str, prompt: str, model: str,
+                               on_chunk: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
+        """Process content with specified LLM model, using the response caches when enabled.
+        
+        If on_chunk is given, streamed response text is passed to it as it arrives.
+        Cached responses are returned without calling on_chunk.
+        """
+        if not self.cache:
+            return await self._call_model(content, prompt, model, on_chunk)
+        
+        key = self._cache_key(content, prompt, model)
+        result = "Error: request did not complete"
         try:
-            if model.startswith('gpt') and self.openai_client:
-                return self._process_openai(content, prompt, model)
-            elif model.startswith('claude') and self.anthropic_client:
-                return self._process_anthropic(content, prompt, model)
-            elif model.startswith('local:') and REQUESTS_AVAILABLE:
-                return self._process_local(content, prompt, model)
-            else:
-                return f"Error: Model {model} not supported or API key not configured"
-        except Exception as e:
-            return f"Error processing with {model}: {str(e)}"
+            result = await self._process_cached(key, content, prompt, model, on_chunk)
+            return result
+        finally:
+            # Hand the result to near-duplicates in this batch waiting on this input
+            shared = self._shared.get(key)
+            if shared is not None and not shared.done():
+                shared.set_result(result)
+    
+    async def _process_cached(self, key: str, content: str, prompt: str, model: str,
+                              on_chunk: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
+        """Look the request up in the exact and semantic caches before calling the model"""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        vector = None
+        namespace = self._namespace(model)
+        if self.semantic_cache:
+            if key in self._prefetched:
+                return self._prefetched.pop(key)
+            
+            leader = self._leaders.pop(key, None)
+            if leader is not None:
+                # A near-identical input earlier in this batch is already being processed
+                shared = await self._shared[leader]
+                if not shared.startswith("Error"):
+                    self.semantic_cache.hits += 1
+                    return shared
+            
+            vector = self._vectors.pop(key, None)
+            if vector is None:
+                vector = await asyncio.to_thread(self.semantic_cache.embed, f"{prompt}\n\n{content}")
+                cached = self.semantic_cache.get(vector, namespace)
+                if cached is not None:
+                    return cached
+        
+        result = await self._call_model(content, prompt, model, on_chunk)
+        if not result.startswith("Error"):
+            self.cache.set(key, result)
+            if self.semantic_cache:
+                self.semantic_cache.set(vector, namespace, result)
+        return result
+    
+    def close(self):
+        """Print cache statistics and release the caches"""
+        if self.cache:
+            print(f"Cache hits: {self.cache.hits}, misses: {self.cache.misses}")
+            self.cache.close()
+            self.cache = None
+        if self.semantic_cache:
+            print(f"Semantic cache hits: {self.semantic_cache.hits}")
+            self.semantic_cache.close()
+            self.semantic_cache = None
+    
+    async def _call_model(self, content: str, prompt: str, model: str,
+                          on_chunk: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
+        """Dispatch to the provider for the given model, retrying transient failures"""
+        max_retries = int(self.config.get('max_retries', 5))
+        emitted = False
+        
+        async def forward(text: str):
+            nonlocal emitted
+            emitted = True
+            await on_chunk(text)
+        
+        stream_to = forward if on_chunk else None
+        for attempt in range(max_retries + 1):
+            await self.limiter.acquire()
+            try:
+                if model.startswith('gpt') and self.openai_client:
+                    return await self._process_openai(content, prompt, model, stream_to)
+                elif model.startswith('claude') and self.anthropic_client:
+                    return await self._process_anthropic(content, prompt, model, stream_to)
+                elif model.startswith('local:') and HTTPX_AVAILABLE:
+                    return await self._process_local(content, prompt, model)
+                else:
+                    return f"Error: Model {model} not supported or API key not configured"
+            except Exception as e:
+                # Part of a streamed response may already be on disk, so only retry clean failures
+                if attempt < max_retries and not emitted and is_retryable(e):
+                    retry_after = get_retry_after(e)
+                    if retry_after is not None:
+                        # The provider told us to back off: pause every request to it
+                        self.limiter.pause(retry_after)
+                    else:
+                        await asyncio.sleep(min(30.0, 2 ** attempt) + random.uniform(0, 1))
+                    continue
+                return f"Error processing with {model}: {str(e)}"
     
-    def _process_openai(self, content: str, prompt: str, model: str) -> str:
+    async def _process_openai(self, content: str, prompt: str, model: str,
+                              on_chunk: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
         """Process with OpenAI models"""
         full_prompt = f"{prompt}\n\nContent to process:\n{content}"
         
-        response = self.openai_client.chat.completions.create(
+        if on_chunk:
+            stream = await self.openai_client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": full_prompt}],
+                max_tokens=self.config.get('max_tokens', 2000),
+                temperature=self.config.get('temperature', 0.7),
+                stream=True
+            )
+            parts = []
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    await on_chunk(text)
+            return "".join(parts)
+        
+        response = await self.openai_client.chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": full_prompt}],
             max_tokens=self.config.get('max_tokens', 2000),
@@ -73,11 +628,25 @@ class LLMProcessor:
         
         return response.choices[0].message.content
     
-    def _process_anthropic(self, content: str, prompt: str, model: str) -> str:
+    async def _process_anthropic(self, content: str, prompt: str, model: str,
+                                 on_chunk: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
         """Process with Anthropic models"""
         full_prompt = f"{prompt}\n\nContent to process:\n{content}"
         
-        response = self.anthropic_client.messages.create(
+        if on_chunk:
+            parts = []
+            async with self.anthropic_client.messages.stream(
+                model=model,
+                max_tokens=self.config.get('max_tokens', 2000),
+                temperature=self.config.get('temperature', 0.7),
+                messages=[{"role": "user", "content": full_prompt}]
+            ) as stream:
+                async for text in stream.text_stream:
+                    parts.append(text)
+                    await on_chunk(text)
+            return "".join(parts)
+        
+        response = await self.anthropic_client.messages.create(
             model=model,
             max_tokens=self.config.get('max_tokens', 2000),
             temperature=self.config.get('temperature', 0.7),
@@ -86,14 +655,15 @@ class LLMProcessor:
         
         return response.content[0].text
     
-    def _process_local(self, content: str, prompt: str, model: str) -> str:
+    async def _process_local(self, content: str, prompt: str, model: str) -> str:
         """Process with local LLM (Ollama)"""
         # Extract model name from "local:modelname" format
         local_model = model.replace('local:', '')
         full_prompt = f"{prompt}\n\nContent to process:\n{content}"
         
         # Ollama API endpoint
-        url = "http://localhost:11434/api/generate"
+        base_url = self.config.get('ollama_url') or "http://localhost:11434"
+        url = f"{base_url.rstrip('/')}/api/generate"
         
         payload = {
             "model": local_model,
@@ -106,27 +676,125 @@ class LLMProcessor:
         }
         
         try:
-            response = requests.post(url, json=payload, timeout=60)
+            response = await get_http_client().post(
+                url, content=json_dumps(payload),
+                headers={"Content-Type": "application/json"}, timeout=60
+            )
             response.raise_for_status()
             
-            result = response.json()
+            result = json_loads(response.content)
             return result.get('response', 'No response from local model')
             
-        except requests.exceptions.ConnectionError:
-            return "Error: Cannot connect to local LLM at localhost:11434. Is Ollama running?"
-        except requests.exceptions.Timeout:
+        except httpx.ConnectError:
+            return f"Error: Cannot connect to local LLM at {base_url}. Is Ollama running?"
+        except httpx.TimeoutException:
             return "Error: Local LLM request timed out"
+        except httpx.HTTPStatusError as e:
+            if is_retryable(e):
+                raise
+            return f"Error with local LLM: {str(e)}"
         except Exception as e:
             return f"Error with local LLM: {str(e)}"
 
+class StreamingResultFile:
+    """Result file that is written chunk by chunk while the response streams in"""
+    
+    def __init__(self, path: Path, header: str):
+        self.path = path
+        self.header = header
+        self.started = False
+        self._file = None
+    
+    async def write(self, text: str):
+        """Append streamed text, opening the file and writing the header on the first chunk"""
+        if self._file is None:
+            if AIOFILES_AVAILABLE:
+                self._file = await aiofiles.open(self.path, 'w', encoding='utf-8')
+            else:
+                self._file = open(self.path, 'w', encoding='utf-8')
+            self.started = True
+            await self._write(self.header)
+        await self._write(text)
+    
+    async def _write(self, text: str):
+        if AIOFILES_AVAILABLE:
+            await self._file.write(text)
+        else:
+            self._file.write(text)
+    
+    async def close(self):
+        if self._file is not None:
+            if AIOFILES_AVAILABLE:
+                await self._file.close()
+            else:
+                self._file.close()
+            self._file = None
+    
+    async def discard(self):
+        """Close and delete a partially written file"""
+        await self.close()
+        if self.started:
+            self.path.unlink(missing_ok=True)
+            self.started = False
+
+SUMMARY_LOG_NAME = "processing_summary.jsonl"
+
+class SummaryLog:
+    """Append-only JSONL record of saved results, used to resume interrupted runs"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+    
+    def completed(self) -> set:
+        """(original_file, request key) pairs of the entries already recorded"""
+        keys = set()
+        if not self.path.exists():
+            return keys
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json_loads(line)
+                    keys.add((entry["original_file"], entry["key"]))
+                except (ValueError, KeyError, TypeError):
+                    # A line cut short by a crash; that file is simply processed again
+                    continue
+        return keys
+    
+    def append(self, entry: Dict[str, Any]):
+        """Write one entry and flush it so it survives a crash"""
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(json_dumps(entry) + b'\n')
+        self._file.flush()
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
 class FileProcessor:
     """Handles file iteration and processing"""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        start_logging()
         self.llm_processor = LLMProcessor(config)
         self.processed_count = 0
         self.error_count = 0
+        
+        # The model name is fixed for this processor, so fill it into the pattern once
+        # (colons replaced for Windows compatibility)
+        self._model_safe = config.get('model', 'unknown').replace(':', '-')
+        self._pattern_cache: Dict[str, str] = {}
+    
+    def _render_pattern(self, naming_pattern: str) -> str:
+        """Custom naming pattern with the per-run parts already filled in"""
+        rendered = self._pattern_cache.get(naming_pattern)
+        if rendered is None:
+            rendered = naming_pattern.replace("{model}", self._model_safe)
+            self._pattern_cache[naming_pattern] = rendered
+        return rendered
     
     def get_files_to_process(self, directory: str, extensions: List[str]) -> List[Path]:
         """Get all files matching the specified extensions"""
@@ -134,164 +802,308 @@ class FileProcessor:
         directory_path = Path(directory)
         
         if not directory_path.exists():
-            print(f"Error: Directory {directory} does not exist")
+            log.error(f"Error: Directory {directory} does not exist")
             return files
         
-        for ext in extensions:
-            pattern = f"**/*{ext}" if not ext.startswith('.') else f"**/*{ext}"
-            files.extend(directory_path.glob(pattern))
+        # Walk the tree once and match every extension per entry. Like Path.glob('**/*ext'):
+        # symlinked directories are not entered (no cycles or double visits), and names
+        # match case-sensitively except on Windows (normcase)
+        suffixes = tuple(os.path.normcase(ext) for ext in extensions)
+        pending = [str(directory_path)]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif os.path.normcase(entry.name).endswith(suffixes) and entry.is_file():
+                        files.append(Path(entry.path))
         
         return sorted(files)
     
-    def read_file_content(self, file_path: Path) -> str:
+    async def read_file_content(self, file_path: Path) -> str:
         """Read file content with proper encoding handling"""
         try:
-            # Try different encodings
-            encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']
-            
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        return f.read()
-                except UnicodeDecodeError:
-                    continue
+            if AIOFILES_AVAILABLE:
+                async with aiofiles.open(file_path, 'rb') as f:
+                    raw = await f.read()
+            else:
+                raw = await asyncio.to_thread(file_path.read_bytes)
             
-            # If all encodings fail, read as binary and decode with errors='replace'
-            with open(file_path, 'rb') as f:
-                return f.read().decode('utf-8', errors='replace')
+            # Inputs are UTF-8 (JSON/CSV); drop a BOM and replace any stray undecodable bytes
+            if raw.startswith(b'\xef\xbb\xbf'):
+                raw = raw[3:]
+            return raw.decode('utf-8', errors='replace')
                 
         except Exception as e:
             return f"Error reading file: {str(e)}"
     
-    def save_result(self, file_path: Path, result: str, output_dir: str, naming_pattern: str, prompt: str) -> str:
+    def get_output_file(self, file_path: Path, output_dir: str, naming_pattern: str, counter: int = 0) -> Path:
+        """Build the output path for a file based on the naming pattern"""
+        output_path = Path(output_dir)
+        
+        # Generate output filename based on pattern
+        if naming_pattern == "original_name":
+            output_filename = f"{file_path.stem}_processed.txt"
+        elif naming_pattern == "timestamp":
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_filename = f"processed_{timestamp}_{file_path.stem}.txt"
+        elif naming_pattern == "sequential":
+            output_filename = f"processed_{counter:04d}_{file_path.stem}.txt"
+        else:
+            # Custom pattern - replace the per-file placeholders
+            output_filename = self._render_pattern(naming_pattern).replace("{original_name}", file_path.stem)
+            if "{timestamp}" in output_filename:
+                output_filename = output_filename.replace("{timestamp}", datetime.now().strftime("%Y%m%d_%H%M%S"))
+            output_filename = output_filename.replace("{counter}", str(counter))
+            # Checked on the final name, so e.g. {original_name} of a.txt.txt gives a.txt
+            if not output_filename.endswith('.txt'):
+                output_filename += '.txt'
+        
+        return output_path / output_filename
+    
+    def format_header(self, file_path: Path, prompt: str) -> str:
+        """Metadata written at the top of every result file"""
+        return (
+            f"Original file: {file_path}\n"
+            f"Processed on: {datetime.now().isoformat()}\n"
+            f"Model used: {self.config.get('model', 'unknown')}\n"
+            f"Prompt: {prompt}\n"
+            + "=" * 50 + "\n\n"
+        )
+    
+    async def save_result(self, file_path: Path, result: str, output_dir: str, naming_pattern: str, prompt: str,
+                          counter: int = 0) -> str:
         """Save LLM result to file"""
         try:
-            output_path = Path(output_dir)
-            output_path.mkdir(parents=True, exist_ok=True)
-            
-            # Generate output filename based on pattern
-            if naming_pattern == "original_name":
-                output_filename = f"{file_path.stem}_processed.txt"
-            elif naming_pattern == "timestamp":
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_filename = f"processed_{timestamp}_{file_path.stem}.txt"
-            elif naming_pattern == "sequential":
-                output_filename = f"processed_{self.processed_count:04d}_{file_path.stem}.txt"
-            else:
-                # Custom pattern - replace placeholders
-                output_filename = naming_pattern.replace("{original_name}", file_path.stem)
-                output_filename = output_filename.replace("{timestamp}", datetime.now().strftime("%Y%m%d_%H%M%S"))
-                output_filename = output_filename.replace("{counter}", str(self.processed_count))
-                # Replace colons in model name for Windows compatibility
-                model_name = self.config.get('model', 'unknown').replace(':', '-')
-                output_filename = output_filename.replace("{model}", model_name)
-                if not output_filename.endswith('.txt'):
-                    output_filename += '.txt'
-            
-            output_file = output_path / output_filename
+            output_file = self.get_output_file(file_path, output_dir, naming_pattern, counter)
             
             # Save result with metadata
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(f"Original file: {file_path}\n")
-                f.write(f"Processed on: {datetime.now().isoformat()}\n")
-                f.write(f"Model used: {self.config.get('model', 'unknown')}\n")
-                f.write(f"Prompt: {prompt}\n")
-                f.write("=" * 50 + "\n\n")
-                f.write(result)
+            text = self.format_header(file_path, prompt) + result
+            if AIOFILES_AVAILABLE:
+                async with aiofiles.open(output_file, 'w', encoding='utf-8') as f:
+                    await f.write(text)
+            else:
+                await asyncio.to_thread(write_text_file, output_file, text)
             
             return str(output_file)
             
         except Exception as e:
-            print(f"Error saving result for {file_path}: {str(e)}")
+            log.error(f"Error saving result for {file_path}: {str(e)}")
             return ""
     
-    def process_files(self, directory: str, prompt: str) -> Dict[str, Any]:
-        """Main method to process all files"""
-        print(f"Starting file processing...")
-        print(f"Directory: {directory}")
-        print(f"Extensions: {self.config.get('file_extensions', [])}")
-        print(f"Model: {self.config.get('model', 'unknown')}")
-        print("-" * 50)
-        
-        files = self.get_files_to_process(directory, self.config.get('file_extensions', []))
-        
-        if not files:
-            print("No files found to process")
-            return {"processed": 0, "errors": 0, "files": []}
-        
-        print(f"Found {len(files)} files to process")
-        
-        results = []
-        
-        for i, file_path in enumerate(files, 1):
-            print(f"Processing {i}/{len(files)}: {file_path.name}")
+    async def _handle_file(self, file_path: Path, content: str, index: int, total: int, prompt: str,
+                           output_dir: str, semaphore: asyncio.Semaphore, stats: Dict[str, int],
+                           summary: SummaryLog, counters: List[int],
+                           duplicates: Optional[List[Path]] = None) -> List[Dict[str, Any]]:
+        """Process and save a single file, fanning the result out to files with identical content;
+        counters holds the {counter} of file_path followed by those of the duplicates.
+        Returns the summary entries of the files saved"""
+        duplicates = duplicates or []
+        async with semaphore:
+            log.info(f"Processing {index}/{total}: {file_path.name}"
+                  + (f" (+{len(duplicates)} identical)" if duplicates else ""))
             
+            writer = None
             try:
-                # Read file content
-                content = self.read_file_content(file_path)
-                
                 if content.startswith("Error reading file"):
-                    print(f"  [ERROR] {content}")
-                    self.error_count += 1
-                    continue
+                    log.error(f"  [ERROR] {file_path.name}: {content}")
+                    stats["errors"] += 1
+                    return []
+                
+                naming_pattern = self.config.get('naming_pattern', 'original_name')
+                if self.config.get('stream_responses', True):
+                    # Streamed responses are written to the output file as they arrive
+                    writer = StreamingResultFile(
+                        self.get_output_file(file_path, output_dir, naming_pattern, counters[0]),
+                        self.format_header(file_path, prompt)
+                    )
                 
                 # Process with LLM
-                result = self.llm_processor.process_with_llm(
-                    content, 
-                    prompt, 
-                    self.config.get('model', 'gpt-3.5-turbo')
-                )
+                try:
+                    result = await self.llm_processor.process_with_llm(
+                        content, 
+                        prompt, 
+                        self.config.get('model', 'gpt-3.5-turbo'),
+                        writer.write if writer else None
+                    )
+                finally:
+                    if writer:
+                        await writer.close()
                 
                 if result.startswith("Error"):
-                    print(f"  [ERROR] {result}")
-                    self.error_count += 1
-                    continue
+                    log.error(f"  [ERROR] {file_path.name}: {result}")
+                    stats["errors"] += 1 + len(duplicates)
+                    if writer:
+                        await writer.discard()
+                    return []
                 
-                # Save result
-                output_file = self.save_result(
-                    file_path, 
-                    result, 
-                    self.config.get('output_directory', './output'),
-                    self.config.get('naming_pattern', 'original_name'),
-                    prompt
-                )
-                
-                if output_file:
-                    print(f"  [OK] Saved to: {output_file}")
-                    self.processed_count += 1
-                    results.append({
-                        "original_file": str(file_path),
-                        "output_file": output_file,
-                        "status": "success"
-                    })
-                else:
-                    print(f"  [ERROR] Failed to save result")
-                    self.error_count += 1
-                
-                # Add delay between requests to avoid rate limiting
-                if i < len(files):
-                    time.sleep(self.config.get('delay_between_files', 1))
+                entries = []
+                key = self.llm_processor._cache_key(content, prompt, self.config.get('model', 'gpt-3.5-turbo'))
+                for i, path in enumerate([file_path] + duplicates):
+                    # Save result (already on disk if it was streamed)
+                    if i == 0 and writer and writer.started:
+                        output_file = str(writer.path)
+                    else:
+                        output_file = await self.save_result(
+                            path, 
+                            result, 
+                            output_dir,
+                            naming_pattern,
+                            prompt,
+                            counters[i]
+                        )
+                    
+                    if output_file:
+                        log.info(f"  [OK] Saved to: {output_file}")
+                        stats["processed"] += 1
+                        entry = {
+                            "original_file": str(path),
+                            "output_file": output_file,
+                            "status": "success",
+                            "key": key
+                        }
+                        summary.append(entry)
+                        entries.append(entry)
+                    else:
+                        log.error(f"  [ERROR] Failed to save result for {path.name}")
+                        stats["errors"] += 1
+                return entries
                 
             except Exception as e:
-                print(f"  [ERROR] Error processing {file_path.name}: {str(e)}")
-                self.error_count += 1
+                log.error(f"  [ERROR] Error processing {file_path.name}: {str(e)}")
+                stats["errors"] += 1 + len(duplicates)
+                if writer:
+                    await writer.discard()
+            
+            return []
+    
+    async def process_files_async(self, directory: str, prompt: str,
+                                  output_directory: Optional[str] = None) -> Dict[str, Any]:
+        """Process all files concurrently, bounded by the 'concurrency' setting"""
+        output_dir = output_directory or self.config.get('output_directory', './output')
+        # Per-run counters, so several runs can share this processor concurrently
+        stats = {"processed": 0, "errors": 0, "skipped": 0}
+        
+        log.info("Starting file processing...")
+        log.info(f"Directory: {directory}")
+        log.info(f"Extensions: {self.config.get('file_extensions', [])}")
+        log.info(f"Model: {self.config.get('model', 'unknown')}")
+        log.info("-" * 50)
+        
+        files = self.get_files_to_process(directory, self.config.get('file_extensions', []))
+        
+        if not files:
+            log.info("No files found to process")
+            return {"processed": 0, "errors": 0, "files": []}
+        
+        # Each file's {counter} is its position in the sorted list, fixed before any task
+        # runs, so names don't depend on completion order (or on files skipped below)
+        counters = list(range(len(files)))
+        
+        concurrency = max(1, int(self.config.get('concurrency', 5)))
+        log.info(f"Found {len(files)} files to process (concurrency: {concurrency})")
+        
+        # Read everything up front so cache lookups can run as one batch
+        contents = await asyncio.gather(*(self.read_file_content(file_path) for file_path in files))
+        model = self.config.get('model', 'gpt-3.5-turbo')
+        
+        # Skip requests already saved by an earlier, interrupted run into the same output directory
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        summary = SummaryLog(Path(output_dir) / SUMMARY_LOG_NAME)
+        if self.config.get('resume', True):
+            completed = summary.completed()
+            if completed:
+                pending = [
+                    (file_path, content, counter) for file_path, content, counter in zip(files, contents, counters)
+                    if (str(file_path), self.llm_processor._cache_key(content, prompt, model)) not in completed
+                ]
+                stats["skipped"] = len(files) - len(pending)
+                if stats["skipped"]:
+                    log.info(f"Skipping {stats['skipped']} files already processed (see {SUMMARY_LOG_NAME})")
+                    files = [file_path for file_path, _, _ in pending]
+                    contents = [content for _, content, _ in pending]
+                    counters = [counter for _, _, counter in pending]
+        
+        await self.llm_processor.prepare_batch(
+            [content for content in contents if not content.startswith("Error reading file")],
+            prompt,
+            model
+        )
+        
+        # Files with identical content are sent to the model once
+        groups: Dict[str, List[int]] = {}
+        for i, content in enumerate(contents):
+            key = str(i) if content.startswith("Error reading file") else content_digest(content)
+            groups.setdefault(key, []).append(i)
+        if len(groups) < len(files):
+            log.info(f"Skipping {len(files) - len(groups)} duplicate files (identical content)")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [
+            self._handle_file(files[first], contents[first], first + 1, len(files), prompt, output_dir,
+                              semaphore, stats, summary, [counters[first]] + [counters[i] for i in rest],
+                              [files[i] for i in rest])
+            for first, *rest in groups.values()
+        ]
+        try:
+            entries = await asyncio.gather(*tasks)
+        finally:
+            summary.close()
+        results = [entry for group_entries in entries for entry in group_entries]
+        self.processed_count += stats["processed"]
+        self.error_count += stats["errors"]
         
-        print("-" * 50)
-        print(f"Processing complete!")
-        print(f"Successfully processed: {self.processed_count}")
-        print(f"Errors: {self.error_count}")
+        log.info("-" * 50)
+        log.info("Processing complete!")
+        log.info(f"Successfully processed: {stats['processed']}")
+        log.info(f"Errors: {stats['errors']}")
         
         return {
-            "processed": self.processed_count,
-            "errors": self.error_count,
+            "processed": stats["processed"],
+            "errors": stats["errors"],
+            "skipped": stats["skipped"],
             "files": results
         }
+    
+    def process_files(self, directory: str, prompt: str, output_directory: Optional[str] = None) -> Dict[str, Any]:
+        """Main method to process all files"""
+        async def run():
+            try:
+                return await self.process_files_async(directory, prompt, output_directory)
+            finally:
+                await close_shared_clients()
+        
+        return asyncio.run(run())
+    
+    def close(self):
+        """Release resources held by the LLM processor"""
+        self.llm_processor.close()
+
+def write_text_file(path: Path, text: str):
+    """Write text to a file as UTF-8"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def get_requests_per_minute(config: Dict[str, Any]) -> float:
+    """Get the request budget, falling back to the legacy delay_between_files setting"""
+    if config.get('requests_per_minute'):
+        return float(config['requests_per_minute'])
+    delay = float(config.get('delay_between_files', 0) or 0)
+    return 60.0 / delay if delay > 0 else 0.0
+
+def save_summary(results: Dict[str, Any], output_directory: str) -> Path:
+    """Save the processing summary next to the results"""
+    summary_file = Path(output_directory) / "processing_summary.json"
+    summary_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(summary_file, 'wb') as f:
+        f.write(json_dumps(results, indent=True))
+    return summary_file
 
 def load_config(config_file: str) -> Dict[str, Any]:
     """Load configuration from JSON file"""
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(config_file, 'rb') as f:
+            return json_loads(f.read())
     except FileNotFoundError:
         print(f"Config file {config_file} not found. Using default configuration.")
         return get_default_config()
@@ -309,6 +1121,18 @@ def get_default_config() -> Dict[str, Any]:
         "max_tokens": 2000,
         "temperature": 0.7,
         "delay_between_files": 1,
+        "concurrency": 5,
+        "requests_per_minute": 60,
+        "max_retries": 5,
+        "stream_responses": True,
+        "use_cache": True,
+        "cache_file": "./llm_cache.sqlite",
+        "cache_nondeterministic": False,
+        "semantic_cache": False,
+        "semantic_cache_threshold": 0.95,
+        "log_file": "",
+        "resume": True,
+        "ollama_url": "http://localhost:11434",
         "openai_api_key": "",
         "anthropic_api_key": ""
     }
@@ -319,16 +1143,18 @@ def create_sample_config():
     config["openai_api_key"] = "your-openai-api-key-here"
     config["anthropic_api_key"] = "your-anthropic-api-key-here"
     
-    with open("config.json", 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2)
+    with open("config.json", 'wb') as f:
+        f.write(json_dumps(config, indent=True))
     
     print("Created sample config.json file. Please edit it with your API keys and preferences.")
 
-def main():
+async def main_async():
     parser = argparse.ArgumentParser(description="Automate file processing with LLM")
     parser.add_argument("--directory", "-d", help="Directory containing files to process")
     parser.add_argument("--prompt", "-p", help="Prompt to send to LLM")
     parser.add_argument("--config", "-c", default="config.json", help="Configuration file path")
+    parser.add_argument("--output", "-o", help="Output directory (overrides output_directory in the config)")
+    parser.add_argument("--model", "-m", help="Model to use (overrides model in the config)")
     parser.add_argument("--create-config", action="store_true", help="Create sample configuration file")
     
     args = parser.parse_args()
@@ -343,8 +1169,12 @@ def main():
         parser.print_help()
         return
     
-    # Load configuration
+    # Load configuration; command-line values take precedence
     config = load_config(args.config)
+    if args.output:
+        config['output_directory'] = args.output
+    if args.model:
+        config['model'] = args.model
     
     # Validate required settings
     model = config.get('model', '')
@@ -357,15 +1187,20 @@ def main():
         return
     
     # Create processor and run
+    start_logging(config.get('log_file') or None)
     processor = FileProcessor(config)
-    results = processor.process_files(args.directory, args.prompt)
+    try:
+        results = await processor.process_files_async(args.directory, args.prompt)
+    finally:
+        processor.close()
+        await close_shared_clients()
     
     # Save processing summary
-    summary_file = Path(config.get('output_directory', './output')) / "processing_summary.json"
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2)
-    
-    print(f"Processing summary saved to: {summary_file}")
+    summary_file = save_summary(results, config.get('output_directory', './output'))
+    log.info(f"Processing summary saved to: {summary_file}")
+
+def main():
+    asyncio.run(main_async())
 
 if __name__ == "__main__":
     main()
@@ -5,49 +5,21 @@ Reads all settings from settings.txt and runs the automation
 """
 
 import os
-import subprocess
-import sys
+import asyncio
+import logging
 from pathlib import Path
+from collections import defaultdict
+
+from file_llm_automation import FileProcessor, load_config, close_shared_clients, start_logging
+from _automation import folder_prefix, run_single_automation
+from _settings import parse_settings
+
+log = logging.getLogger("run_automation")
 
 def read_settings():
     """Read settings from settings.txt file with multi-line PROMPT support"""
-    settings = {}
     try:
-        with open("settings.txt", 'r', encoding='utf-8') as f:
-            lines = [ln.rstrip('\n') for ln in f]
-
-        i = 0
-        while i < len(lines):
-            raw = lines[i]
-            line = raw.strip()
-            i += 1
-            if not line or line.startswith('#'):
-                continue
-
-            if '=' in line:
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
-
-                if key in ['API_PROMPT', 'PROMPT']:
-                    prompt_lines = [value]
-                    # Collect continuation lines until we hit a line that starts with a key=value pattern
-                    while i < len(lines):
-                        next_line = lines[i]
-                        # Check if this line looks like a new setting (KEY=VALUE at start of line)
-                        stripped = next_line.strip()
-                        if stripped and '=' in stripped and not stripped.startswith(' ') and not stripped.startswith('\t') and not stripped.startswith('-') and not stripped.startswith('*'):
-                            # This looks like a new key=value setting, stop collecting
-                            break
-                        else:
-                            # This is part of the prompt, add it
-                            prompt_lines.append(next_line)
-                            i += 1
-                    settings['PROMPT'] = '\n'.join(prompt_lines).strip()
-                else:
-                    settings[key] = value
-
-        return settings
+        return parse_settings("settings.txt")
     except FileNotFoundError:
         print("Error: settings.txt not found!")
         print("Please create settings.txt with your settings")
@@ -56,7 +28,25 @@ def read_settings():
         print(f"Error reading settings.txt: {str(e)}")
         return None
 
-def main():
+def find_missing_folders(folders):
+    """Folders that do not exist, found with one directory listing per parent"""
+    by_parent = defaultdict(dict)
+    for folder in folders:
+        path = os.path.normpath(folder)
+        # normcase so the comparison is case-insensitive on Windows, like the filesystem
+        by_parent[os.path.dirname(path) or "."][os.path.normcase(os.path.basename(path))] = folder
+    
+    missing = []
+    for parent, names in by_parent.items():
+        try:
+            with os.scandir(parent) as entries:
+                existing = {os.path.normcase(entry.name) for entry in entries if entry.is_dir()}
+        except OSError:
+            existing = set()
+        missing.extend(folder for name, folder in names.items() if name not in existing)
+    return missing
+
+async def main_async():
     print("File LLM Automation Tool - Settings Runner")
     print("=" * 45)
     
@@ -72,6 +62,7 @@ def main():
     model = settings.get('MODEL', 'gpt-3.5-turbo')
     runs_per_combination = int(settings.get('RUNS_PER_COMBINATION', 1))
     prompt_identifier = settings.get('PROMPT_IDENTIFIER', '19')
+    parallel_combinations = max(1, int(settings.get('PARALLEL_COMBINATIONS', 4)))
     
     # Parse input folders
     input_folders = [folder.strip() for folder in input_folders_str.split(',') if folder.strip()]
@@ -89,12 +80,13 @@ def main():
         print("Error: API_PROMPT not specified in settings.txt")
         return
     
-    # Check if input folders exist
-    for input_folder in input_folders:
-        if not os.path.exists(input_folder):
+    # Check if input folders exist, listing each parent directory once
+    missing = find_missing_folders(input_folders)
+    if missing:
+        for input_folder in missing:
             print(f"Error: Input folder '{input_folder}' does not exist!")
-            print("Please check the path in settings.txt")
-            return
+        print("Please check the path in settings.txt")
+        return
     
     # Create output base folder if it doesn't exist
     os.makedirs(output_base_folder, exist_ok=True)
@@ -103,76 +95,63 @@ def main():
     print(f"Output Base Folder: {output_base_folder}")
     print(f"Model: {model}")
     print(f"Runs per combination: {runs_per_combination}")
+    print(f"Parallel combinations: {parallel_combinations}")
     print(f"Prompt ID: {prompt_identifier}")
     print(f"Prompt: {prompt[:100]}...")
     print("-" * 45)
     
-    # Process each input folder
-    for run_num in range(runs_per_combination):
-        print(f"\nRun {run_num + 1}/{runs_per_combination}")
-        print("=" * 50)
+    # config.json supplies API keys and defaults; the model comes from settings.txt
+    config = load_config("config.json")
+    config['model'] = model
+    # Replace colons in model name for Windows compatibility
+    model_name = model.replace(':', '-')
+    
+    # Folder naming depends only on the folder, so work it out once per folder
+    folders = []
+    for input_folder in input_folders:
+        folder = input_folder.rstrip('/\\')
+        parent_folder = os.path.basename(os.path.dirname(folder))  # Conversion or Drop_off
+        format_type = os.path.basename(folder)  # JSON or CSV
         
-        for input_folder in input_folders:
-            # Create output folder for this combination matching local LLM pattern
-            folder_path = Path(input_folder)
-            parent_folder = folder_path.parent.name  # Conversion or Drop_off
-            format_type = folder_path.name  # JSON or CSV
-            
-            # Map parent folder to CO/DO
-            if parent_folder.lower() == 'conversion':
-                prefix = 'CO'
-            elif parent_folder.lower() == 'drop_off':
-                prefix = 'DO'
-            else:
-                prefix = parent_folder.upper()
-            
-            # Replace colons in model name for Windows compatibility
-            model_name = model.replace(':', '-')
-            
+        # Map parent folder to CO/DO
+        prefix = folder_prefix(parent_folder)
+        folders.append((input_folder, f"{prefix}_{format_type}"))
+    
+    # Build every (run, folder) combination up front
+    jobs = []
+    for run_num in range(runs_per_combination):
+        for input_folder, name in folders:
             # Create proper naming pattern: CO_JSON_ANCHORED_gpt-4o-mini_prompt18_run1
-            output_folder = os.path.join(output_base_folder, f"{prefix}_{format_type}_ANCHORED_{model_name}_prompt{prompt_identifier}_run{run_num + 1}")
-            
-            os.makedirs(output_folder, exist_ok=True)
-            
-            print(f"\nProcessing: {prefix}_{format_type}")
-            print(f"Output: {output_folder}")
-            
-            # Update config.json with the output folder and model
-            try:
-                import json
-                with open("config.json", 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                
-                config['output_directory'] = output_folder
-                config['model'] = model
-                
-                with open("config.json", 'w', encoding='utf-8') as f:
-                    json.dump(config, f, indent=2)
-                
-            except Exception as e:
-                print(f"Warning: Could not update config.json: {e}")
-            
-            # Run the automation tool
-            try:
-                cmd = [
-                    sys.executable, 
-                    "file_llm_automation.py",
-                    "--directory", input_folder,
-                    "--prompt", prompt
-                ]
-                
-                print("Starting automation...")
-                result = subprocess.run(cmd, check=True)
-                print("[OK] Automation completed successfully!")
-                print(f"Results saved to: {output_folder}")
-                
-            except subprocess.CalledProcessError as e:
-                print(f"[ERROR] Error running automation: {e}")
-            except Exception as e:
-                print(f"[ERROR] Unexpected error: {e}")
-    
-    print(f"\nAll processing completed!")
-    print(f"Results saved to: {output_base_folder}")
+            output_folder = Path(output_base_folder) / f"{name}_ANCHORED_{model_name}_prompt{prompt_identifier}_run{run_num + 1}"
+            jobs.append((input_folder, output_folder, f"Run {run_num + 1}/{runs_per_combination}: {name}"))
+    
+    # Create every output folder in one pass before the runs start
+    for _, output_folder, _ in jobs:
+        output_folder.mkdir(parents=True, exist_ok=True)
+    
+    # Every combination runs in this process and event loop, sharing one processor
+    start_logging(config.get('log_file') or None)
+    processor = FileProcessor(config)
+    semaphore = asyncio.Semaphore(parallel_combinations)
+    
+    async def run_job(input_folder, output_folder, label):
+        async with semaphore:
+            log.info(f"\n{label}")
+            log.info(f"Output: {output_folder}")
+            if await run_single_automation(processor, Path(input_folder), prompt, output_folder):
+                log.info(f"Results saved to: {output_folder}")
+    
+    try:
+        await asyncio.gather(*(run_job(*job) for job in jobs))
+    finally:
+        processor.close()
+        await close_shared_clients()
+    
+    log.info(f"\nAll processing completed!")
+    log.info(f"Results saved to: {output_base_folder}")
+
+def main():
+    asyncio.run(main_async())
 
 if __name__ == "__main__":
     main()
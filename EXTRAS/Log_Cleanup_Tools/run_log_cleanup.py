@@ -77,9 +77,9 @@ def main():
     print("-" * 40)
     
     try:
-        # Run the cleanup tool
+        # Run the cleanup tool (-u so its progress reaches us line by line)
         cmd = [
-            sys.executable,
+            sys.executable, "-u",
             "log_cleanup.py",
             "--input", input_folder,
             "--output", output_folder,
@@ -87,13 +87,19 @@ def main():
         ]
         
         print("🧹 Starting log cleanup...")
-        subprocess.run(cmd, check=True)
+        env = dict(os.environ, PYTHONIOENCODING="utf-8")
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                              encoding="utf-8", errors="replace", bufsize=1, env=env) as proc:
+            for line in proc.stdout:
+                print(line, end='')
+            returncode = proc.wait()
+        
+        if returncode != 0:
+            print(f"❌ Error running log cleanup: exit code {returncode}")
+            return 1
         print("✅ Log cleanup completed successfully!")
         print(f"📁 Results saved to: {output_folder}")
         
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error running log cleanup: {e}")
-        return 1
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
         return 1
@@ -5,79 +5,114 @@ Simple batch concatenator - processes all subfolders in a parent folder
 
 import os
 import sys
+import io
+import shutil
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def concatenate_text_files(input_folder, output_filename="concatenated_text.txt"):
+# Inputs are streamed to the output in chunks of this size, never read whole
+COPY_BUFFER_SIZE = 1 << 20
+
+# Subfolders concatenated at once; the work is disk-bound, so threads are enough
+MAX_FOLDER_WORKERS = 8
+
+SEPARATOR = "=" * 80
+
+def _encode(text):
+    """Text written by the concatenator itself, with the platform's line endings (as text mode would write it)"""
+    return text.replace("\n", os.linesep).encode('utf-8')
+
+def concatenate_text_files(input_folder, output_filename="concatenated_text.txt", log=print):
     """
     Read all text files from input_folder and concatenate them into one file.
+    Progress messages go through log (print by default).
     """
     folder_path = Path(input_folder)
     
     if not folder_path.exists():
-        print(f"Error: Folder '{input_folder}' does not exist!")
+        log(f"Error: Folder '{input_folder}' does not exist!")
         return False
     
     if not folder_path.is_dir():
-        print(f"Error: '{input_folder}' is not a directory!")
+        log(f"Error: '{input_folder}' is not a directory!")
         return False
     
-    # Get all text files in the folder
-    text_files = []
-    for file_path in folder_path.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() in ['.txt', '.text']:
-            text_files.append(file_path)
+    # Get all text files in the folder, except the output of an earlier run
+    # (streaming it into itself would never reach the end). Entries from scandir
+    # carry their name and usually their type, so the name is checked first and
+    # is_file() rarely needs a stat
+    with os.scandir(folder_path) as entries:
+        text_files = [e for e in entries
+                      if e.name != output_filename
+                      and e.name.lower().endswith(('.txt', '.text'))
+                      and e.is_file()]
     
     if not text_files:
-        print(f"No text files found in '{input_folder}'")
+        log(f"No text files found in '{input_folder}'")
         return False
     
     # Sort files for consistent ordering
     text_files.sort(key=lambda x: x.name)
     
-    print(f"Found {len(text_files)} text files in '{input_folder}'")
-    print("Files to concatenate:")
+    log(f"Found {len(text_files)} text files in '{input_folder}'")
+    log("Files to concatenate:")
     for file_path in text_files:
-        print(f"  - {file_path.name}")
+        log(f"  - {file_path.name}")
     
     # Create output file path
     output_path = folder_path / output_filename
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as output_file:
+        with open(output_path, 'wb') as output_file:
             for i, file_path in enumerate(text_files):
-                print(f"Processing {file_path.name}...")
+                log(f"Processing {file_path.name}...")
                 
+                # Where this file's part starts, so a failed copy can be taken back
+                start = output_file.tell()
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as input_file:
-                        content = input_file.read()
-                    
-                    # Add file separator and filename header
-                    if i > 0:
-                        output_file.write("\n" + "="*80 + "\n")
-                    
-                    output_file.write(f"FILE: {file_path.name}\n")
-                    output_file.write("="*80 + "\n")
-                    output_file.write(content)
-                    
-                    # Add newline at the end if content doesn't end with one
-                    if content and not content.endswith('\n'):
-                        output_file.write('\n')
+                    with open(file_path, 'rb') as input_file:
+                        # Add file separator and filename header
+                        header = f"FILE: {file_path.name}\n{SEPARATOR}\n"
+                        if i > 0:
+                            header = f"\n{SEPARATOR}\n" + header
+                        output_file.write(_encode(header))
+                        
+                        # Bytes are copied as-is, without decoding them (so also
+                        # with their own line endings)
+                        shutil.copyfileobj(input_file, output_file, COPY_BUFFER_SIZE)
+                        
+                        # Add newline at the end if content doesn't end with one
+                        if input_file.tell() > 0:
+                            input_file.seek(-1, os.SEEK_END)
+                            if input_file.read(1) not in (b'\n', b'\r'):
+                                output_file.write(_encode("\n"))
                         
                 except Exception as e:
-                    print(f"Warning: Could not read '{file_path.name}': {e}")
-                    # Add error message to output
-                    output_file.write(f"\n" + "="*80 + "\n")
-                    output_file.write(f"FILE: {file_path.name} (ERROR: {e})\n")
-                    output_file.write("="*80 + "\n")
-                    output_file.write(f"Error reading file: {e}\n")
+                    log(f"Warning: Could not read '{file_path.name}': {e}")
+                    # Drop whatever part of the file was copied, then add error message to output
+                    output_file.seek(start)
+                    output_file.truncate()
+                    output_file.write(_encode(
+                        f"\n{SEPARATOR}\n"
+                        f"FILE: {file_path.name} (ERROR: {e})\n"
+                        f"{SEPARATOR}\n"
+                        f"Error reading file: {e}\n"
+                    ))
         
-        print(f"\nSuccessfully concatenated {len(text_files)} files into '{output_path}'")
+        log(f"\nSuccessfully concatenated {len(text_files)} files into '{output_path}'")
         return True
         
     except Exception as e:
-        print(f"Error writing output file: {e}")
+        log(f"Error writing output file: {e}")
         return False
 
+def _concatenate_subfolder(subfolder, output_filename):
+    """concatenate_text_files for one subfolder in a worker thread; returns (success, messages)"""
+    output = io.StringIO()
+    success = concatenate_text_files(str(subfolder), output_filename, log=functools.partial(print, file=output))
+    return success, output.getvalue()
+
 def batch_concatenate_folders(parent_folder, output_filename="concatenated_text.txt"):
     """
     Process all subfolders in parent_folder and concatenate text files in each subfolder.
@@ -115,18 +150,22 @@ def batch_concatenate_folders(parent_folder, output_filename="concatenated_text.
     success_count = 0
     failed_folders = []
     
-    for i, subfolder in enumerate(subfolders):
-        print(f"\nProcessing subfolder {i+1}/{len(subfolders)}: {subfolder.name}")
-        print("-" * 40)
-        
-        success = concatenate_text_files(str(subfolder), output_filename)
-        
-        if success:
-            success_count += 1
-            print(f"✓ Successfully processed '{subfolder.name}'")
-        else:
-            failed_folders.append(subfolder.name)
-            print(f"✗ Failed to process '{subfolder.name}'")
+    # Each subfolder writes its own output file, so they run in threads; results come
+    # back in subfolder order, each one's messages printed as a block
+    workers = min(MAX_FOLDER_WORKERS, len(subfolders))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        processed = executor.map(_concatenate_subfolder, subfolders, [output_filename] * len(subfolders))
+        for i, (subfolder, (success, output)) in enumerate(zip(subfolders, processed)):
+            print(f"\nProcessing subfolder {i+1}/{len(subfolders)}: {subfolder.name}")
+            print("-" * 40)
+            print(output, end='')
+            
+            if success:
+                success_count += 1
+                print(f"✓ Successfully processed '{subfolder.name}'")
+            else:
+                failed_folders.append(subfolder.name)
+                print(f"✗ Failed to process '{subfolder.name}'")
     
     print("\n" + "="*60)
     print("BATCH PROCESSING SUMMARY")
@@ -14,11 +14,12 @@ fig, ax = plt.subplots(1, 1, figsize=(10, 8))
 
 # Prepare data for boxplot
 model_names = list(data.keys())
-values_list = list(data.values())
+# One row per model; boxplot takes one column per box
+values = np.array([data[name] for name in model_names], dtype=np.float64)
 
 # Create boxplot with all models in one diagram
-box_plot = ax.boxplot(values_list, 
-                      labels=model_names,
+box_plot = ax.boxplot(values.T, 
+                      tick_labels=model_names,
                       vert=True, 
                       patch_artist=True,
                       boxprops=dict(facecolor='#cce5ff', color='#004080', linewidth=2),
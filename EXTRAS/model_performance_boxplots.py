@@ -7,87 +7,111 @@ It processes model accuracy data and generates comprehensive visualizations.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-from collections import defaultdict
+from io import StringIO
+import csv
 import re
 
+# Trailing run/repeat suffixes, in the order they are stripped: "_1", then "_1(72.41%)", then "_run1"
+_TAIL_RE = re.compile(r'(?:_\d+)?(?:_\d+\([^)]*\))?(?:_run\d+)?$')
+_RUN_RE = re.compile(r'run(\d+)')
+
 class ModelPerformanceAnalyzer:
     def __init__(self):
-        self.data = []
-        self.model_stats = defaultdict(list)
+        self.df = pd.DataFrame(columns=['full_name', 'base_model', 'accuracy', 'run'])
+        self.model_stats = {}
+        self.stats = pd.DataFrame()
+        self.colors = None
         
     def parse_model_data(self, data_text):
-        """Parse the raw model data text into structured format"""
-        lines = data_text.strip().split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Split by whitespace and extract components
-            parts = line.split()
-            if len(parts) < 6:
-                continue
-                
-            # Extract model name (first part)
-            model_name = parts[0]
-            
-            # Extract accuracy percentage - look for the first percentage value
-            accuracy_pct = None
-            for part in parts:
-                if '%' in part and not part.startswith('0.00%'):
-                    try:
-                        accuracy_pct = float(part.replace('%', ''))
-                        break
-                    except ValueError:
-                        continue
-            
-            if accuracy_pct is not None:
-                # Clean model name to extract base model
-                base_model = self.extract_base_model(model_name)
-                self.data.append({
-                    'full_name': model_name,
-                    'base_model': base_model,
-                    'accuracy': accuracy_pct,
-                    'run': self.extract_run_number(model_name)
-                })
-                self.model_stats[base_model].append(accuracy_pct)
+        """Parse the raw tab-separated model data text into structured format"""
+        data_text = data_text.strip()
+        if not data_text:
+            return
+        
+        # Rows have a varying number of trailing columns, so name enough columns for the widest one
+        width = max(line.count('\t') for line in data_text.splitlines()) + 1
+        if width < 6:
+            return
+        raw = pd.read_csv(StringIO(data_text), sep='\t', header=None, names=range(width),
+                          dtype=str, quoting=csv.QUOTE_NONE, engine='c')
+        raw = raw[raw[5].notna()]
+        
+        # Model name is the first token (some carry a note such as " (11-30)"), accuracy is column 5
+        full_name = raw[0].str.strip().str.split().str[0]
+        parsed = pd.DataFrame({
+            'full_name': full_name,
+            'base_model': full_name.str.replace(_TAIL_RE, '', n=1, regex=True),
+            'accuracy': pd.to_numeric(raw[5].str.strip().str.rstrip('%'), errors='coerce'),
+            'run': pd.to_numeric(full_name.str.extract(_RUN_RE, expand=False)).fillna(1).astype(int)
+        }).dropna(subset=['accuracy'])
+        
+        self.df = parsed.reset_index(drop=True) if self.df.empty else pd.concat([self.df, parsed], ignore_index=True)
+        
+        # Per-model statistics in one grouped pass, in order of first appearance
+        grouped = self.df.groupby('base_model', sort=False)['accuracy']
+        self.model_stats = grouped.apply(list).to_dict()
+        self.stats = grouped.agg(['mean', 'std', 'min', 'max', 'median', 'count'])
+        # Population std dev (ddof=0), as shown on the box plot summary
+        self.stats['pstd'] = (self.stats['std'] * np.sqrt((self.stats['count'] - 1) / self.stats['count'])).fillna(0.0)
+        self.colors = None
     
     def extract_base_model(self, model_name):
         """Extract base model name from full model identifier"""
-        # Remove run numbers and extract base model
-        base = re.sub(r'_run\d+$', '', model_name)
-        base = re.sub(r'_\d+\([^)]*\)$', '', base)
-        base = re.sub(r'_\d+$', '', base)
-        return base
+        return _TAIL_RE.sub('', model_name, count=1)
     
     def extract_run_number(self, model_name):
         """Extract run number from model name"""
-        run_match = re.search(r'run(\d+)', model_name)
+        run_match = _RUN_RE.search(model_name)
         if run_match:
             return int(run_match.group(1))
         return 1
     
-    def create_box_plots(self, save_path='model_performance_boxplots.png'):
-        """Create comprehensive box plots for model performance"""
-        if not self.data:
+    def _model_colors(self):
+        """One colour per model, shared by every plot"""
+        if self.colors is None:
+            import matplotlib.pyplot as plt
+            self.colors = plt.cm.Set3(np.linspace(0, 1, len(self.stats)))
+        return self.colors
+    
+    @staticmethod
+    def _figure(fig, nrows, ncols, figsize):
+        """Reuse fig (cleared) when given, otherwise create a new figure"""
+        import matplotlib.pyplot as plt
+        if fig is None:
+            return plt.subplots(nrows, ncols, figsize=figsize)
+        fig.clear()
+        fig.set_size_inches(*figsize)
+        return fig, fig.subplots(nrows, ncols)
+    
+    def create_box_plots(self, save_path='model_performance_boxplots.png', fig=None, dpi=300):
+        """Create comprehensive box plots for model performance
+        
+        Pass fig to render into an existing Figure (e.g. when sweeping several datasets);
+        dpi=150 is plenty for on-screen use.
+        """
+        if self.df.empty:
             print("No data to plot!")
             return
         
+        # Plotting libraries are only loaded when a plot is actually drawn
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Patch
+        
         # Create figure with subplots
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        fig, axes = self._figure(fig, 2, 2, (15, 12))
         fig.suptitle('Model Performance Analysis - Box Plots', fontsize=16, fontweight='bold')
         
         # Convert to DataFrame for easier manipulation
-        df = pd.DataFrame(self.data)
+        df = self.df
         
         # 1. Box plot by base model
         ax1 = axes[0, 0]
-        base_models = list(self.model_stats.keys())
+        base_models = list(self.stats.index)
         accuracy_data = [self.model_stats[model] for model in base_models]
+        if self.stats['count'].nunique() == 1:
+            # Same number of runs for every model: one 2-D array, a column per model
+            accuracy_data = np.array(accuracy_data, dtype=np.float64).T
         
         box_plot1 = ax1.boxplot(accuracy_data, tick_labels=base_models, patch_artist=True)
         ax1.set_title('Accuracy Distribution by Model', fontweight='bold')
@@ -95,24 +119,40 @@ class ModelPerformanceAnalyzer:
         ax1.tick_params(axis='x', rotation=45)
         
         # Color the boxes
-        colors = plt.cm.Set3(np.linspace(0, 1, len(base_models)))
-        for patch, color in zip(box_plot1['boxes'], colors):
+        for patch, color in zip(box_plot1['boxes'], self._model_colors()):
             patch.set_facecolor(color)
         
+        x_pos = np.arange(len(base_models))
+        
         # 2. Violin plot for better distribution visualization
         ax2 = axes[0, 1]
-        sns.violinplot(data=df, x='base_model', y='accuracy', ax=ax2)
+        ax2.violinplot(accuracy_data, positions=x_pos, showmedians=True)
         ax2.set_title('Accuracy Distribution (Violin Plot)', fontweight='bold')
         ax2.set_ylabel('Accuracy (%)')
+        ax2.set_xticks(x_pos)
+        ax2.set_xticklabels(base_models)
         ax2.tick_params(axis='x', rotation=45)
         
-        # 3. Box plot with run numbers
+        # 3. Box plot with run numbers: one box per (model, run), side by side within each model
         ax3 = axes[1, 0]
-        sns.boxplot(data=df, x='base_model', y='accuracy', hue='run', ax=ax3)
+        groups = {key: group.to_numpy() for key, group in df.groupby(['base_model', 'run'], sort=False)['accuracy']}
+        runs = sorted(df['run'].unique())
+        width = 0.8 / len(runs)
+        run_colors = plt.cm.tab10(np.arange(len(runs)) % 10)
+        for j, (run, color) in enumerate(zip(runs, run_colors)):
+            present = [(i, groups[(model, run)]) for i, model in enumerate(base_models) if (model, run) in groups]
+            box_plot3 = ax3.boxplot([values for _, values in present],
+                                    positions=[i - 0.4 + width * (j + 0.5) for i, _ in present],
+                                    widths=width * 0.9, patch_artist=True, manage_ticks=False)
+            for patch in box_plot3['boxes']:
+                patch.set_facecolor(color)
         ax3.set_title('Accuracy by Model and Run', fontweight='bold')
         ax3.set_ylabel('Accuracy (%)')
+        ax3.set_xticks(x_pos)
+        ax3.set_xticklabels(base_models)
         ax3.tick_params(axis='x', rotation=45)
-        ax3.legend(title='Run', bbox_to_anchor=(1.05, 1), loc='upper left')
+        ax3.legend(handles=[Patch(facecolor=color, label=str(run)) for run, color in zip(runs, run_colors)],
+                   title='Run', bbox_to_anchor=(1.05, 1), loc='upper left')
         
         # 4. Statistical summary
         ax4 = axes[1, 1]
@@ -120,67 +160,53 @@ class ModelPerformanceAnalyzer:
         
         # Calculate statistics
         stats_text = "Statistical Summary:\n\n"
-        for model in base_models:
-            accuracies = self.model_stats[model]
-            mean_acc = np.mean(accuracies)
-            std_acc = np.std(accuracies)
-            min_acc = np.min(accuracies)
-            max_acc = np.max(accuracies)
-            median_acc = np.median(accuracies)
-            
+        for model, row in self.stats.iterrows():
             stats_text += f"{model}:\n"
-            stats_text += f"  Mean: {mean_acc:.2f}%\n"
-            stats_text += f"  Std Dev: {std_acc:.2f}%\n"
-            stats_text += f"  Min: {min_acc:.2f}%\n"
-            stats_text += f"  Max: {max_acc:.2f}%\n"
-            stats_text += f"  Median: {median_acc:.2f}%\n\n"
+            stats_text += f"  Mean: {row['mean']:.2f}%\n"
+            stats_text += f"  Std Dev: {row['pstd']:.2f}%\n"
+            stats_text += f"  Min: {row['min']:.2f}%\n"
+            stats_text += f"  Max: {row['max']:.2f}%\n"
+            stats_text += f"  Median: {row['median']:.2f}%\n\n"
         
         ax4.text(0.1, 0.9, stats_text, transform=ax4.transAxes, fontsize=10,
                 verticalalignment='top', fontfamily='monospace')
         
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        fig.tight_layout()
+        fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
         plt.show()
         
         print(f"Box plots saved to: {save_path}")
     
-    def create_detailed_analysis(self, save_path='detailed_model_analysis.png'):
-        """Create detailed analysis with individual model performance"""
-        if not self.data:
+    def create_detailed_analysis(self, save_path='detailed_model_analysis.png', fig=None, dpi=300):
+        """Create detailed analysis with individual model performance (fig and dpi as in create_box_plots)"""
+        if self.df.empty:
             print("No data to analyze!")
             return
         
-        df = pd.DataFrame(self.data)
+        import matplotlib.pyplot as plt
+        
+        # One seeded generator per render, so the jittered scatter is identical every time
+        rng = np.random.default_rng(0)
+        
+        df = self.df
         
         # Create a larger figure for detailed analysis
-        fig, axes = plt.subplots(2, 1, figsize=(16, 12))
+        fig, axes = self._figure(fig, 2, 1, (16, 12))
         
         # 1. Individual model performance with error bars
         ax1 = axes[0]
-        base_models = df['base_model'].unique()
+        stats = self.stats
+        base_models = list(stats.index)
         x_pos = np.arange(len(base_models))
         
-        means = []
-        stds = []
-        mins = []
-        maxs = []
-        
-        for model in base_models:
-            model_data = df[df['base_model'] == model]['accuracy']
-            means.append(model_data.mean())
-            stds.append(model_data.std())
-            mins.append(model_data.min())
-            maxs.append(model_data.max())
-        
         # Plot means with error bars
-        bars = ax1.bar(x_pos, means, yerr=stds, capsize=5, alpha=0.7, 
-                      color=plt.cm.Set3(np.linspace(0, 1, len(base_models))))
+        bars = ax1.bar(x_pos, stats['mean'], yerr=stats['std'], capsize=5, alpha=0.7, 
+                      color=self._model_colors())
         
-        # Add individual data points
-        for i, model in enumerate(base_models):
-            model_data = df[df['base_model'] == model]['accuracy']
-            x_jitter = np.random.normal(i, 0.05, len(model_data))
-            ax1.scatter(x_jitter, model_data, alpha=0.6, s=50, color='red')
+        # Add individual data points, jittered around each model's bar in one scatter call
+        idx = df['base_model'].map({model: i for i, model in enumerate(base_models)}).to_numpy(dtype=float)
+        x_jitter = rng.normal(idx, 0.05, size=len(idx))
+        ax1.scatter(x_jitter, df['accuracy'].to_numpy(), alpha=0.6, s=50, color='red')
         
         ax1.set_xlabel('Model')
         ax1.set_ylabel('Accuracy (%)')
@@ -193,24 +219,18 @@ class ModelPerformanceAnalyzer:
         ax2 = axes[1]
         ax2.axis('off')
         
-        # Create comparison table
-        comparison_data = []
-        for model in base_models:
-            model_data = df[df['base_model'] == model]['accuracy']
-            comparison_data.append({
-                'Model': model,
-                'Mean': f"{model_data.mean():.2f}%",
-                'Std Dev': f"{model_data.std():.2f}%",
-                'Min': f"{model_data.min():.2f}%",
-                'Max': f"{model_data.max():.2f}%",
-                'Runs': len(model_data)
-            })
-        
-        comparison_df = pd.DataFrame(comparison_data)
-        
-        # Create table
-        table = ax2.table(cellText=comparison_df.values,
-                         colLabels=comparison_df.columns,
+        # Create comparison table, formatting whole columns of the cached statistics at once
+        col_labels = ['Model', 'Mean', 'Std Dev', 'Min', 'Max', 'Runs']
+        cell_text = np.column_stack([
+            stats.index.astype(str),
+            *(stats[column].map('{:.2f}%'.format) for column in ['mean', 'std', 'min', 'max']),
+            stats['count'].astype(int).astype(str)
+        ])
+        
+        # Header colours are applied in the same call that builds the table
+        table = ax2.table(cellText=cell_text,
+                         colLabels=col_labels,
+                         colColours=['#40466e'] * len(col_labels),
                          cellLoc='center',
                          loc='center',
                          bbox=[0, 0, 1, 1])
@@ -219,43 +239,41 @@ class ModelPerformanceAnalyzer:
         table.set_fontsize(10)
         table.scale(1.2, 1.5)
         
-        # Style the table
-        for i in range(len(comparison_df.columns)):
-            table[(0, i)].set_facecolor('#40466e')
+        # Header text style (matplotlib has no per-table text colour option)
+        for i in range(len(col_labels)):
             table[(0, i)].set_text_props(weight='bold', color='white')
         
         ax2.set_title('Detailed Performance Comparison', fontweight='bold', pad=20)
         
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        fig.tight_layout()
+        fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
         plt.show()
         
         print(f"Detailed analysis saved to: {save_path}")
     
     def print_summary(self):
         """Print a summary of the analysis"""
-        if not self.data:
+        if self.df.empty:
             print("No data to summarize!")
             return
         
-        print("\n" + "="*60)
-        print("MODEL PERFORMANCE ANALYSIS SUMMARY")
-        print("="*60)
-        
-        df = pd.DataFrame(self.data)
-        
-        for model in df['base_model'].unique():
-            model_data = df[df['base_model'] == model]['accuracy']
-            print(f"\n{model}:")
-            print(f"  Runs: {len(model_data)}")
-            print(f"  Accuracy: {model_data.tolist()}")
-            print(f"  Mean: {model_data.mean():.2f}%")
-            print(f"  Std Dev: {model_data.std():.2f}%")
-            print(f"  Range: {model_data.min():.2f}% - {model_data.max():.2f}%")
-            if model_data.mean() > 0:
-                print(f"  Coefficient of Variation: {(model_data.std()/model_data.mean()*100):.2f}%")
+        # Build the whole report from the cached statistics and print it once
+        lines = ["\n" + "="*60, "MODEL PERFORMANCE ANALYSIS SUMMARY", "="*60]
+        for model, row in self.stats.iterrows():
+            if row['mean'] > 0:
+                cv = f"{(row['std']/row['mean']*100):.2f}%"
             else:
-                print(f"  Coefficient of Variation: N/A (mean is 0)")
+                cv = "N/A (mean is 0)"
+            lines.append(
+                f"\n{model}:\n"
+                f"  Runs: {int(row['count'])}\n"
+                f"  Accuracy: {self.model_stats[model]}\n"
+                f"  Mean: {row['mean']:.2f}%\n"
+                f"  Std Dev: {row['std']:.2f}%\n"
+                f"  Range: {row['min']:.2f}% - {row['max']:.2f}%\n"
+                f"  Coefficient of Variation: {cv}"
+            )
+        print("\n".join(lines))
 
 def main():
     # Raw data from the user
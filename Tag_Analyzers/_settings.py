@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Shared parser for the KEY=VALUE settings files (tag_settings.txt, batch_tag_settings.txt)
+"""
+
+def parse_kv_file(settings_file):
+    """Read KEY=VALUE lines into a dict, skipping empty lines and # comments; raises FileNotFoundError"""
+    settings = {}
+    with open(settings_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                settings[key.strip()] = value.strip()
+    return settings
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Shared tag matching for tag_analyzer.py and batch_tag_analyzer.py: reading the analysis
+part of a file, finding its Tag: value and the keywords that classify the value
+"""
+
+import os
+import re
+import mmap
+
+# Look for Tag: that's not in the prompt instructions. Enhanced patterns catch various
+# formats including reasons in brackets; they are tried in this order and the first one
+# that matches anywhere wins. Patterns without line start anchor come FIRST to avoid
+# matching prompt instructions. (Case variants such as tag:/TAG: are covered by IGNORECASE.)
+_TAG_VALUE = rb'([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?'
+TAG_PATTERNS = [
+    # Fallback patterns without line start anchor (these work better)
+    rb'(?-m:Tag:\s*' + _TAG_VALUE + rb'(?=\n|$))',
+    rb'(?-m:Tag\s*:\s*' + _TAG_VALUE + rb'(?=\n|$))',
+    # Fallback patterns for **Tag: format
+    rb'(?-m:\*\*Tag:\s*' + _TAG_VALUE + rb'(?:\*\*|$))',
+    rb'(?-m:\*\*Tag\s*:\s*' + _TAG_VALUE + rb'(?:\*\*|$))',
+    # Fallback patterns for **Tag**: format (with colon after Tag)
+    rb'(?-m:\*\*Tag\*\*:\s*' + _TAG_VALUE + rb'(?=\n|$))',
+    # Patterns with line start anchor (these might match prompt instructions)
+    rb'^Tag:\s*' + _TAG_VALUE,
+    rb'^Tag\s*:\s*' + _TAG_VALUE,
+    # Patterns for **Tag: format
+    rb'^\*\*Tag:\s*' + _TAG_VALUE + rb'(?:\*\*|$)',
+    rb'^\*\*Tag\s*:\s*' + _TAG_VALUE + rb'(?:\*\*|$)',
+    # Patterns for **Tag**: format (with colon after Tag)
+    rb'^\*\*Tag\*\*:\s*' + _TAG_VALUE,
+]
+
+# All patterns as ONE compiled regex, used with .match(): each branch lazily scans the
+# rest of the text before the next branch is tried, which keeps the priority order
+# above (a plain alternation would prefer the leftmost match instead). The patterns are
+# bytes: the markers are ASCII, so files are matched undecoded and only the value is decoded
+TAG_RE = re.compile(b'(?:' + b'|'.join(rb'[\s\S]*?' + p for p in TAG_PATTERNS) + b')',
+                    re.IGNORECASE | re.MULTILINE)
+# Every pattern needs "tag:" / "tag :" / "tag**:" and starts at most 2 characters
+# ("**") before it, so TAG_RE starts there and files without it skip TAG_RE entirely
+TAG_HINT_RE = re.compile(rb'tag(?:\s*|\*\*):', re.IGNORECASE)
+
+# Substrings of the lowercased tag value that mark a conversion / drop-off
+# (substring checks, so e.g. 'convert' also covers 'converted')
+CONVERSION_KEYWORDS = frozenset(['conversion', 'convert', 'converted', 'success', 'completed'])
+DROPOFF_KEYWORDS = frozenset(['drop-off', 'dropoff', 'drop off', 'drop_off', 'abandon', 'abandoned', 'exit', 'left'])
+# Each keyword set as one alternation: a single C-level scan of the value per set
+CONVERSION_RE = re.compile('|'.join(map(re.escape, sorted(CONVERSION_KEYWORDS))))
+DROPOFF_RE = re.compile('|'.join(map(re.escape, sorted(DROPOFF_KEYWORDS))))
+
+# Only this much of the end of a file is read while its last </think> lies inside it
+TAIL_READ_SIZE = 64 * 1024
+
+def find_tag(text):
+    """First match of TAG_PATTERNS in the bytes text in priority order, or None; the value is match.group(match.lastindex)"""
+    hint = TAG_HINT_RE.search(text)
+    if not hint:
+        return None
+    return TAG_RE.match(text, max(hint.start() - 2, 0))
+
+def read_analysis_content(file_path):
+    """
+    Bytes of the analysis result: everything after the last </think>, or the whole file
+    when there is none. Only the tail is read when the marker is found in it.
+    """
+    with open(file_path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(size - TAIL_READ_SIZE, 0))
+        content = f.read()
+        marker = content.rfind(b'</think>')
+        if marker >= 0:
+            # Look for Tag: pattern in the analysis result (after </think>)
+            content = content[marker + len(b'</think>'):]
+        elif size > TAIL_READ_SIZE:
+            # The marker (if any) is further up
+            content = _read_large_analysis_content(f)
+    
+    if b'\r' in content:
+        # Same line endings the patterns saw when the file was read in text mode
+        content = content.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return content
+
+def _read_large_analysis_content(f):
+    """read_analysis_content for a file too large for the tail read: scans a memory map and copies only the analyzed part"""
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        marker = mm.rfind(b'</think>')
+        if marker >= 0:
+            return mm[marker + len(b'</think>'):]
+        
+        # No marker, so the whole file is analyzed; find_tag never looks before the line
+        # holding the first tag hint, so the text up to there is not copied
+        hint = TAG_HINT_RE.search(mm)
+        if not hint:
+            return b''
+        line_start = max(mm.rfind(b'\n', 0, hint.start()), mm.rfind(b'\r', 0, hint.start())) + 1
+        return mm[line_start:]
@@ -2,187 +2,294 @@
 """
 Batch Tag Analyzer - Processes all subfolders in a parent directory
 Analyzes DO/CO files in each subfolder and creates individual Excel reports
+
+Performance notes:
+- The work is regex matching over file text plus Excel/CSV writing; neither runs
+  under a JIT such as Numba (re is not supported there), so don't try one. The tag
+  patterns are compiled once (in _tags.py) as a single bytes alternation instead.
+- For small folders writing the workbook with openpyxl costs more than the analysis;
+  use --format csv when only the results matter.
+- Parallelism is per file (large folders) and per subfolder, via ProcessPoolExecutor.
 """
 
 import os
+import sys
 import pandas as pd
 from pathlib import Path
 import argparse
-import re
+import io
+import csv
+from collections import Counter
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from _settings import parse_kv_file
+from _tags import CONVERSION_RE, DROPOFF_RE, find_tag, read_analysis_content
+
+# Streaming Excel writer (optional, falls back to pandas + openpyxl)
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+# tag_type values returned by analyze_file_for_tag (Conversion / Drop-Off / Mixed / Unknown
+# imply has_tag); the only per-file payload besides the tag value, e.g. from pool workers
+TAG_CONVERSION = 'Conversion'
+TAG_DROPOFF = 'Drop-Off'
+TAG_MIXED = 'Mixed'
+TAG_UNKNOWN = 'Unknown'
+TAG_NONE = 'None'
+TAG_ERROR = 'Error'
+
+# Excel number format of Percent cells
+PERCENT_FORMAT = '0.00%'
+
+# Overall_Summary columns summed per CO/DO group for the statistics sheets
+GROUP_TOTAL_KEYS = ('Total_Files', 'Conversions', 'Drop_Offs', 'Mixed')
+
+# Below this many files a process pool costs more to start than it saves
+PARALLEL_MIN_FILES = 256
+
+class Percent(float):
+    """A rate as a fraction (0.4211), kept numeric and shown as a percentage (42.11%) in Excel/CSV output"""
+
+def rate(count, total):
+    """count / total as a Percent (0 when total is 0)"""
+    return Percent(count / total if total > 0 else 0)
+
+def write_excel(output_file, sheets):
+    """
+    Write {sheet_name: list of row dicts} to an .xlsx file, one column per dict key.
+    With xlsxwriter the rows are streamed to disk (constant_memory). pandas' to_excel
+    writes column by column, which constant_memory cannot take, so the rows are written
+    here directly; without xlsxwriter pandas + openpyxl is used.
+    """
+    if not XLSXWRITER_AVAILABLE:
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            for sheet_name, rows in sheets.items():
+                pd.DataFrame(rows).to_excel(writer, sheet_name=sheet_name, index=False)
+                # Percent cells are plain floats to pandas, so they get their format here
+                worksheet = writer.sheets[sheet_name]
+                for row_num, row in enumerate(rows, 2):
+                    for col_num, value in enumerate(row.values(), 1):
+                        if isinstance(value, Percent):
+                            worksheet.cell(row=row_num, column=col_num).number_format = PERCENT_FORMAT
+        return
+    
+    with xlsxwriter.Workbook(str(output_file), {'constant_memory': True}) as workbook:
+        formats = _excel_formats(workbook)
+        for sheet_name, rows in sheets.items():
+            worksheet = workbook.add_worksheet(sheet_name)
+            if rows:
+                worksheet.write_row(0, 0, list(rows[0]), formats['header'])
+                for row_num, row in enumerate(rows, 1):
+                    _write_excel_row(worksheet, row_num, row, formats)
+
+def _excel_formats(workbook):
+    """Cell formats for an xlsxwriter workbook: 'header' (same look as pandas) and 'percent'"""
+    return {
+        'header': workbook.add_format({'bold': True, 'border': 1, 'align': 'center'}),
+        'percent': workbook.add_format({'num_format': PERCENT_FORMAT})
+    }
+
+def _write_excel_row(worksheet, row_num, row, formats):
+    """Write the values of a row dict, Percent values as percentage cells"""
+    for col_num, value in enumerate(row.values()):
+        worksheet.write(row_num, col_num, value, formats['percent'] if isinstance(value, Percent) else None)
+
+class OverallSummaryWriter:
+    """
+    Overall summary workbook written as subfolder summaries come in. With xlsxwriter each
+    Overall_Summary row goes to disk right away (constant_memory) and only the CO/DO totals
+    are kept in memory; without it the rows are collected and written by write_excel.
+    close() adds the CO/DO statistics sheets; it never raises, errors end up in .error.
+    """
+    
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.rows_written = 0
+        self.error = None
+        self.co_stats = []
+        self.do_stats = []
+        # 'CO' / 'DO' -> running totals row, in the shape compute_group_stats sums
+        self._totals = {}
+        self._rows = []
+        self._workbook = None
+        self._worksheet = None
+        self._formats = None
+        self._closed = False
+    
+    def add(self, row):
+        """Add one subfolder row (a dict with the Overall_Summary columns)"""
+        self.rows_written += 1
+        prefix = row['Subfolder'][:3]
+        if prefix in ('CO_', 'DO_'):
+            totals = self._totals.setdefault(prefix[:2], dict.fromkeys(GROUP_TOTAL_KEYS, 0))
+            for key in GROUP_TOTAL_KEYS:
+                totals[key] += row[key]
+        
+        if not XLSXWRITER_AVAILABLE:
+            self._rows.append(row)
+            return
+        if self.error is not None:
+            return
+        try:
+            if self._workbook is None:
+                # Opened with the first row, so a batch without results leaves no file
+                self._workbook = xlsxwriter.Workbook(str(self.output_file), {'constant_memory': True})
+                self._formats = _excel_formats(self._workbook)
+                self._worksheet = self._workbook.add_worksheet('Overall_Summary')
+                self._worksheet.write_row(0, 0, list(row), self._formats['header'])
+            _write_excel_row(self._worksheet, self.rows_written, row, self._formats)
+        except Exception as e:
+            self.error = e
+    
+    def close(self):
+        """Compute the CO/DO statistics and finish the file (safe to call more than once)"""
+        if self._closed or not self.rows_written:
+            return
+        self._closed = True
+        self.co_stats = compute_group_stats([self._totals['CO']] if 'CO' in self._totals else [], 'CO')
+        self.do_stats = compute_group_stats([self._totals['DO']] if 'DO' in self._totals else [], 'DO')
+        
+        # Overall summary sheet, plus the CO / DO statistics sheets when there are any
+        sheets = {}
+        if self.co_stats:
+            sheets['CO_Statistics'] = self.co_stats
+        if self.do_stats:
+            sheets['DO_Statistics'] = self.do_stats
+        try:
+            if not XLSXWRITER_AVAILABLE:
+                write_excel(self.output_file, {'Overall_Summary': self._rows, **sheets})
+                return
+            if self._workbook is None:
+                return
+            for sheet_name, rows in sheets.items():
+                worksheet = self._workbook.add_worksheet(sheet_name)
+                worksheet.write_row(0, 0, list(rows[0]), self._formats['header'])
+                for row_num, row in enumerate(rows, 1):
+                    _write_excel_row(worksheet, row_num, row, self._formats)
+            self._workbook.close()
+        except Exception as e:
+            if self.error is None:
+                self.error = e
 
 def analyze_file_for_tag(file_path):
     """
     Analyze a file for Tag: patterns and classify as Conversion or Drop-Off.
     Looks for the actual analysis result after </think> tag, not in the prompt.
-    Returns a dictionary with classification and details.
+    Returns a dictionary with has_tag, tag_type (one of the TAG_* values) and tag_value.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split content by </think> to get the actual analysis result
-        parts = content.split('</think>')
-        if len(parts) > 1:
-            # Look for Tag: pattern in the analysis result (after </think>)
-            analysis_content = parts[1]
-        else:
-            # Fallback: look in the entire content for files without </think> separator
-            analysis_content = content
+        analysis_content = read_analysis_content(file_path)
         
         # Look for Tag: pattern (case insensitive) in the analysis content
-        # Enhanced pattern to catch various formats including reasons in brackets
-        # Look for Tag: that's not in the prompt instructions
-        # Put patterns without line start anchor FIRST to avoid matching prompt instructions
-        tag_patterns = [
-            # Fallback patterns without line start anchor (these work better)
-            re.compile(r'Tag:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?=\n|$)', re.IGNORECASE),
-            re.compile(r'Tag\s*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?=\n|$)', re.IGNORECASE),
-            re.compile(r'tag:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?=\n|$)', re.IGNORECASE),
-            re.compile(r'TAG:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?=\n|$)', re.IGNORECASE),
-            # Fallback patterns for **Tag: format
-            re.compile(r'\*\*Tag:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?:\*\*|$)', re.IGNORECASE),
-            re.compile(r'\*\*Tag\s*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?:\*\*|$)', re.IGNORECASE),
-            re.compile(r'\*\*tag:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?:\*\*|$)', re.IGNORECASE),
-            re.compile(r'\*\*TAG:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?:\*\*|$)', re.IGNORECASE),
-            # Fallback patterns for **Tag**: format (with colon after Tag)
-            re.compile(r'\*\*Tag\*\*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?=\n|$)', re.IGNORECASE),
-            re.compile(r'\*\*tag\*\*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?=\n|$)', re.IGNORECASE),
-            re.compile(r'\*\*TAG\*\*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?=\n|$)', re.IGNORECASE),
-            # Patterns with line start anchor (these might match prompt instructions)
-            re.compile(r'^Tag:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?', re.IGNORECASE | re.MULTILINE),
-            re.compile(r'^Tag\s*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?', re.IGNORECASE | re.MULTILINE),
-            re.compile(r'^tag:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?', re.IGNORECASE | re.MULTILINE),
-            re.compile(r'^TAG:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?', re.IGNORECASE | re.MULTILINE),
-            # Patterns for **Tag: format
-            re.compile(r'^\*\*Tag:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?:\*\*|$)', re.IGNORECASE | re.MULTILINE),
-            re.compile(r'^\*\*Tag\s*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?:\*\*|$)', re.IGNORECASE | re.MULTILINE),
-            re.compile(r'^\*\*tag:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?:\*\*|$)', re.IGNORECASE | re.MULTILINE),
-            re.compile(r'^\*\*TAG:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?(?:\*\*|$)', re.IGNORECASE | re.MULTILINE),
-            # Patterns for **Tag**: format (with colon after Tag)
-            re.compile(r'^\*\*Tag\*\*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?', re.IGNORECASE | re.MULTILINE),
-            re.compile(r'^\*\*tag\*\*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?', re.IGNORECASE | re.MULTILINE),
-            re.compile(r'^\*\*TAG\*\*:\s*([a-zA-Z\s\-*:]+)(?:\s*\[.*?\])?', re.IGNORECASE | re.MULTILINE)
-        ]
-        
-        match = None
-        for pattern in tag_patterns:
-            match = pattern.search(analysis_content)
-            if match:
-                break
+        match = find_tag(analysis_content)
         
         if match:
-            tag_value = match.group(1).strip()
+            tag_value = match.group(match.lastindex).decode('utf-8', errors='replace').strip()
             
             # Enhanced classification with more variations
             tag_lower = tag_value.lower()
             
             # Check for conversion patterns
-            conversion_patterns = ['conversion', 'Conversion', '**Tag**: Conversion', 'convert', 'converted', 'success', 'completed']
-            is_conversion = any(pattern in tag_lower for pattern in conversion_patterns)
+            is_conversion = CONVERSION_RE.search(tag_lower) is not None
             
             # Check for drop-off patterns  
-            dropoff_patterns = ['drop-off', 'dropoff', 'drop off', 'drop_off', 'Drop-Off', '**Tag**: Drop-Off', 'abandon', 'abandoned', 'exit', 'left']
-            is_dropoff = any(pattern in tag_lower for pattern in dropoff_patterns)
+            is_dropoff = DROPOFF_RE.search(tag_lower) is not None
             
             if is_conversion and not is_dropoff:
                 return {
                     'has_tag': True,
-                    'tag_type': 'Conversion',
-                    'tag_value': tag_value,
-                    'is_conversion': True,
-                    'is_dropoff': False
+                    'tag_type': TAG_CONVERSION,
+                    'tag_value': tag_value
                 }
             elif is_dropoff and not is_conversion:
                 return {
                     'has_tag': True,
-                    'tag_type': 'Drop-Off',
-                    'tag_value': tag_value,
-                    'is_conversion': False,
-                    'is_dropoff': True
+                    'tag_type': TAG_DROPOFF,
+                    'tag_value': tag_value
                 }
             elif is_conversion and is_dropoff:
                 # If both patterns match, prioritize based on order or context
                 return {
                     'has_tag': True,
-                    'tag_type': 'Mixed',
-                    'tag_value': tag_value,
-                    'is_conversion': True,
-                    'is_dropoff': True
+                    'tag_type': TAG_MIXED,
+                    'tag_value': tag_value
                 }
             else:
                 # Unknown tag type
                 return {
                     'has_tag': True,
-                    'tag_type': 'Unknown',
-                    'tag_value': tag_value,
-                    'is_conversion': False,
-                    'is_dropoff': False
+                    'tag_type': TAG_UNKNOWN,
+                    'tag_value': tag_value
                 }
         else:
             return {
                 'has_tag': False,
-                'tag_type': 'None',
-                'tag_value': '',
-                'is_conversion': False,
-                'is_dropoff': False
+                'tag_type': TAG_NONE,
+                'tag_value': ''
             }
             
     except Exception as e:
         print(f"Error reading {file_path}: {str(e)}")
         return {
             'has_tag': False,
-            'tag_type': 'Error',
-            'tag_value': f'Error: {str(e)}',
-            'is_conversion': False,
-            'is_dropoff': False
+            'tag_type': TAG_ERROR,
+            'tag_value': f'Error: {str(e)}'
         }
 
-def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
+def process_directory(directory_path, output_file="tag_analysis_results.xlsx", parallel=True, output_format='xlsx'):
     """
-    Process all DO/CO files in a directory and create Excel results with detailed analysis
+    Process all DO/CO files in a directory and create Excel results with detailed analysis.
+    With output_format='csv' the results are written as CSV instead (summary in <name>_summary.csv).
+    Returns (success, summary) where summary holds the counts and rates for the overall report.
     """
     directory = Path(directory_path)
     
     if not directory.exists():
         print(f"Error: Directory '{directory_path}' does not exist!")
-        return False
+        return False, None
     
-    # Get all text files in the directory that start with DO or CO
-    files = [f for f in directory.iterdir() if f.is_file() and f.suffix.lower() in ['.txt', '.text'] and (f.name.startswith('DO') or f.name.startswith('CO'))]
+    # Get all text files in the directory that start with DO or CO (name checks first,
+    # so only candidates need is_file(), which scandir usually answers without a stat)
+    # Names and path strings come straight from the entries, no Path object per file
+    with os.scandir(directory) as entries:
+        files = [e.path for e in entries
+                 if e.name.startswith(('DO', 'CO'))
+                 and e.name.lower().endswith(('.txt', '.text'))
+                 and e.is_file()]
     
     if not files:
         print(f"No DO/CO files found in '{directory_path}'")
-        return False
+        return False, None
     
     print(f"Analyzing {len(files)} files (DO/CO files only) in '{directory_path}'")
     print("Looking for Tag: patterns (Conversion/Drop-Off)")
     print("-" * 60)
     
     results = []
-    conversion_count = 0
-    dropoff_count = 0
-    mixed_count = 0
-    unknown_count = 0
-    no_tag_count = 0
-    error_count = 0
-    
-    for file_path in files:
-        filename = file_path.name
-        analysis = analyze_file_for_tag(file_path)
-        
-        # Count different types
-        if analysis['tag_type'] == 'Mixed':
-            mixed_count += 1
-        elif analysis['is_conversion']:
-            conversion_count += 1
-        elif analysis['is_dropoff']:
-            dropoff_count += 1
-        elif analysis['tag_type'] == 'Unknown':
-            unknown_count += 1
-        elif analysis['tag_type'] == 'Error':
-            error_count += 1
-        else:
-            no_tag_count += 1
+    # Per-file status lines, written in one go after the loop instead of a print per file
+    status_lines = []
+    
+    # Files are independent, so large folders are analyzed across processes
+    if parallel and len(files) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            analyses = list(executor.map(analyze_file_for_tag, files, chunksize=32))
+    else:
+        analyses = [analyze_file_for_tag(file_path) for file_path in files]
+    
+    # Count different types
+    counts = Counter(analysis['tag_type'] for analysis in analyses)
+    conversion_count = counts[TAG_CONVERSION]
+    dropoff_count = counts[TAG_DROPOFF]
+    mixed_count = counts[TAG_MIXED]
+    unknown_count = counts[TAG_UNKNOWN]
+    no_tag_count = counts[TAG_NONE]
+    error_count = counts[TAG_ERROR]
+    
+    for file_path, analysis in zip(files, analyses):
+        filename = os.path.basename(file_path)
         
         results.append({
             'Filename': filename,
@@ -192,7 +299,8 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
         # Display status
         status_icon = "[OK]" if analysis['has_tag'] else "[NO]"
         tag_display = analysis['tag_type'] if analysis['has_tag'] else "No Tag"
-        print(f"{status_icon} {filename}: {tag_display}")
+        status_lines.append(f"{status_icon} {filename}: {tag_display}\n")
+    sys.stdout.write(''.join(status_lines))
     
     # Calculate percentages
     total_files = len(files)
@@ -203,9 +311,6 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
     no_tag_percentage = (no_tag_count / total_files) * 100 if total_files > 0 else 0
     error_percentage = (error_count / total_files) * 100 if total_files > 0 else 0
     
-    # Create DataFrame
-    df = pd.DataFrame(results)
-    
     # Create summary data
     summary_data = {
         'Metric': [
@@ -231,28 +336,41 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
             unknown_count,
             no_tag_count,
             error_count,
-            f"{conversion_percentage:.2f}%",
-            f"{dropoff_percentage:.2f}%",
-            f"{mixed_percentage:.2f}%",
-            f"{unknown_percentage:.2f}%",
-            f"{no_tag_percentage:.2f}%",
-            f"{error_percentage:.2f}%"
+            rate(conversion_count, total_files),
+            rate(dropoff_count, total_files),
+            rate(mixed_count, total_files),
+            rate(unknown_count, total_files),
+            rate(no_tag_count, total_files),
+            rate(error_count, total_files)
         ]
     }
     
-    summary_df = pd.DataFrame(summary_data)
-    
-    # Save to Excel with multiple sheets
+    # Save to Excel with multiple sheets (or two CSV files)
     try:
         # Create output directory if it doesn't exist
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            # Write detailed results
-            df.to_excel(writer, sheet_name='Detailed_Results', index=False)
-            # Write summary statistics
-            summary_df.to_excel(writer, sheet_name='Summary_Statistics', index=False)
+        if output_format == 'csv':
+            # Plain csv.writer rows, no pandas/openpyxl needed
+            summary_file = output_path.with_name(output_path.stem + '_summary.csv')
+            with open(output_path, 'w', newline='', encoding='utf-8') as fh:
+                writer = csv.writer(fh)
+                writer.writerow(['Filename', 'Tag_Type'])
+                writer.writerows((r['Filename'], r['Tag_Type']) for r in results)
+            with open(summary_file, 'w', newline='', encoding='utf-8') as fh:
+                writer = csv.writer(fh)
+                writer.writerow(['Metric', 'Count'])
+                writer.writerows((metric, f"{count:.2%}" if isinstance(count, Percent) else count)
+                                 for metric, count in zip(summary_data['Metric'], summary_data['Count']))
+        else:
+            write_excel(output_file, {
+                # Detailed results
+                'Detailed_Results': results,
+                # Summary statistics
+                'Summary_Statistics': [{'Metric': metric, 'Count': count}
+                                       for metric, count in zip(summary_data['Metric'], summary_data['Count'])]
+            })
         
         print("-" * 60)
         print("ANALYSIS COMPLETE")
@@ -266,26 +384,74 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
         print(f"No tags found: {no_tag_count} ({no_tag_percentage:.2f}%)")
         print(f"Errors: {error_count} ({error_percentage:.2f}%)")
         print("-" * 60)
-        print("Excel file contains two sheets:")
-        print("- 'Detailed_Results': Individual file analysis")
-        print("- 'Summary_Statistics': Overall percentages and counts")
+        if output_format == 'csv':
+            print(f"Summary statistics saved to: {summary_file}")
+        else:
+            print("Excel file contains two sheets:")
+            print("- 'Detailed_Results': Individual file analysis")
+            print("- 'Summary_Statistics': Overall percentages and counts")
         
-        return True
+        return True, {
+            'total_files': total_files,
+            'conversions': conversion_count,
+            'dropoffs': dropoff_count,
+            'mixed': mixed_count,
+            'conversion_rate': rate(conversion_count, total_files),
+            'dropoff_rate': rate(dropoff_count, total_files),
+            'mixed_rate': rate(mixed_count, total_files)
+        }
         
     except Exception as e:
+        if output_format == 'csv':
+            print(f"Error saving CSV file: {str(e)}")
+            return False, None
         print(f"Error saving Excel file: {str(e)}")
         print("Saving as CSV instead...")
         csv_file = output_file.replace('.xlsx', '.csv')
         csv_path = Path(csv_file)
         csv_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(csv_file, index=False, sep=',', encoding='utf-8')
+        pd.DataFrame(results).to_csv(csv_file, index=False, sep=',', encoding='utf-8')
         print(f"Results saved to: {csv_file}")
         print("Note: Open the CSV file in Excel or a text editor to see the columns properly separated.")
-        return False
+        return False, None
+
+def _process_subfolder(subfolder, output_format='xlsx'):
+    """process_directory for one subfolder in a worker process; returns (success, summary, console output)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        # Already in a worker process, so no nested pool per folder
+        success, summary = process_directory(str(subfolder), str(subfolder / f"Tag_analysis_results.{output_format}"),
+                                             parallel=False, output_format=output_format)
+    return success, summary, output.getvalue()
+
+def compute_group_stats(rows, label):
+    """
+    Overall statistics sheet rows for one group (CO or DO) of subfolder summaries.
+    Returns an empty list when the group has no subfolders.
+    """
+    if not rows:
+        return []
+    
+    # Plain sums; a group is only a few rows
+    total_files = sum(r['Total_Files'] for r in rows)
+    total_conversions = sum(r['Conversions'] for r in rows)
+    total_dropoffs = sum(r['Drop_Offs'] for r in rows)
+    total_mixed = sum(r['Mixed'] for r in rows)
+    
+    return [
+        {'Metric': f'Total {label} Files', 'Count': total_files},
+        {'Metric': f'Total {label} Conversions', 'Count': total_conversions},
+        {'Metric': f'Total {label} Drop-Offs', 'Count': total_dropoffs},
+        {'Metric': f'Total {label} Mixed', 'Count': total_mixed},
+        {'Metric': f'Average {label} Conversion Rate (%)', 'Count': rate(total_conversions, total_files)},
+        {'Metric': f'Average {label} Drop-Off Rate (%)', 'Count': rate(total_dropoffs, total_files)},
+        {'Metric': f'Average {label} Mixed Rate (%)', 'Count': rate(total_mixed, total_files)}
+    ]
 
-def batch_analyze_folders(parent_folder):
+def batch_analyze_folders(parent_folder, output_format='xlsx'):
     """
     Process all subfolders in parent_folder and analyze DO/CO files in each subfolder.
+    output_format ('xlsx' or 'csv') applies to the per-subfolder results.
     """
     parent_path = Path(parent_folder)
     
@@ -319,151 +485,70 @@ def batch_analyze_folders(parent_folder):
     
     success_count = 0
     failed_folders = []
-    all_results = []
+    overall_output = parent_path / "Overall_Tag_Analysis_Summary.xlsx"
+    overall = OverallSummaryWriter(overall_output)
     
-    for i, subfolder in enumerate(subfolders):
-        print(f"\nProcessing subfolder {i+1}/{len(subfolders)}: {subfolder.name}")
-        print("-" * 40)
-        
-        # Create output file path for this subfolder
-        output_file = subfolder / "Tag_analysis_results.xlsx"
-        
-        success = process_directory(str(subfolder), str(output_file))
-        
+    def collect(subfolder, success, summary):
+        nonlocal success_count
         if success:
             success_count += 1
             print(f"[OK] Successfully processed '{subfolder.name}'")
             
-            # Collect summary data for overall report
-            try:
-                summary_df = pd.read_excel(output_file, sheet_name='Summary_Statistics')
-                total_files = summary_df[summary_df['Metric'] == 'Total Files']['Count'].iloc[0]
-                conversions = summary_df[summary_df['Metric'] == 'Conversions']['Count'].iloc[0]
-                dropoffs = summary_df[summary_df['Metric'] == 'Drop-Offs']['Count'].iloc[0]
-                mixed = summary_df[summary_df['Metric'] == 'Mixed (Both)']['Count'].iloc[0]
-                conversion_rate = summary_df[summary_df['Metric'] == 'Conversion Rate (%)']['Count'].iloc[0]
-                dropoff_rate = summary_df[summary_df['Metric'] == 'Drop-Off Rate (%)']['Count'].iloc[0]
-                mixed_rate = summary_df[summary_df['Metric'] == 'Mixed Rate (%)']['Count'].iloc[0]
-                
-                all_results.append({
-                    'Subfolder': subfolder.name,
-                    'Total_Files': total_files,
-                    'Conversions': conversions,
-                    'Drop_Offs': dropoffs,
-                    'Mixed': mixed,
-                    'Conversion_Rate': conversion_rate,
-                    'DropOff_Rate': dropoff_rate,
-                    'Mixed_Rate': mixed_rate
-                })
-            except Exception as e:
-                print(f"Warning: Could not read summary from {subfolder.name}: {e}")
+            # Summary data for overall report (straight from process_directory, no need to
+            # read it back from the Excel file), written to the workbook as it comes in
+            overall.add({
+                'Subfolder': subfolder.name,
+                'Total_Files': summary['total_files'],
+                'Conversions': summary['conversions'],
+                'Drop_Offs': summary['dropoffs'],
+                'Mixed': summary['mixed'],
+                'Conversion_Rate': summary['conversion_rate'],
+                'DropOff_Rate': summary['dropoff_rate'],
+                'Mixed_Rate': summary['mixed_rate']
+            })
         else:
             failed_folders.append(subfolder.name)
             print(f"[FAIL] Failed to process '{subfolder.name}'")
     
-    # Create overall summary report
-    if all_results:
-        overall_df = pd.DataFrame(all_results)
-        overall_output = parent_path / "Overall_Tag_Analysis_Summary.xlsx"
-        
-        # Create CO vs DO analysis
-        co_analysis = []
-        do_analysis = []
-        
-        for result in all_results:
-            subfolder_name = result['Subfolder']
-            if subfolder_name.startswith('CO_'):
-                co_analysis.append({
-                    'Subfolder': subfolder_name,
-                    'Total_Files': result['Total_Files'],
-                    'Conversions': result['Conversions'],
-                    'Conversion_Rate': result['Conversion_Rate'],
-                    'Drop_Offs': result['Drop_Offs'],
-                    'DropOff_Rate': result['DropOff_Rate'],
-                    'Mixed': result['Mixed'],
-                    'Mixed_Rate': result['Mixed_Rate']
-                })
-            elif subfolder_name.startswith('DO_'):
-                do_analysis.append({
-                    'Subfolder': subfolder_name,
-                    'Total_Files': result['Total_Files'],
-                    'Conversions': result['Conversions'],
-                    'Conversion_Rate': result['Conversion_Rate'],
-                    'Drop_Offs': result['Drop_Offs'],
-                    'DropOff_Rate': result['DropOff_Rate'],
-                    'Mixed': result['Mixed'],
-                    'Mixed_Rate': result['Mixed_Rate']
-                })
-        
-        co_df = pd.DataFrame(co_analysis)
-        do_df = pd.DataFrame(do_analysis)
-        
-        # Calculate overall CO and DO statistics
-        co_stats = []
-        do_stats = []
-        
-        if not co_df.empty:
-            co_total_files = co_df['Total_Files'].sum()
-            co_total_conversions = co_df['Conversions'].sum()
-            co_total_dropoffs = co_df['Drop_Offs'].sum()
-            co_total_mixed = co_df['Mixed'].sum()
-            co_avg_conversion_rate = (co_total_conversions / co_total_files * 100) if co_total_files > 0 else 0
-            co_avg_dropoff_rate = (co_total_dropoffs / co_total_files * 100) if co_total_files > 0 else 0
-            co_avg_mixed_rate = (co_total_mixed / co_total_files * 100) if co_total_files > 0 else 0
-            
-            co_stats = [
-                {'Metric': 'Total CO Files', 'Count': co_total_files},
-                {'Metric': 'Total CO Conversions', 'Count': co_total_conversions},
-                {'Metric': 'Total CO Drop-Offs', 'Count': co_total_dropoffs},
-                {'Metric': 'Total CO Mixed', 'Count': co_total_mixed},
-                {'Metric': 'Average CO Conversion Rate (%)', 'Count': f"{co_avg_conversion_rate:.2f}%"},
-                {'Metric': 'Average CO Drop-Off Rate (%)', 'Count': f"{co_avg_dropoff_rate:.2f}%"},
-                {'Metric': 'Average CO Mixed Rate (%)', 'Count': f"{co_avg_mixed_rate:.2f}%"}
-            ]
-        
-        if not do_df.empty:
-            do_total_files = do_df['Total_Files'].sum()
-            do_total_conversions = do_df['Conversions'].sum()
-            do_total_dropoffs = do_df['Drop_Offs'].sum()
-            do_total_mixed = do_df['Mixed'].sum()
-            do_avg_conversion_rate = (do_total_conversions / do_total_files * 100) if do_total_files > 0 else 0
-            do_avg_dropoff_rate = (do_total_dropoffs / do_total_files * 100) if do_total_files > 0 else 0
-            do_avg_mixed_rate = (do_total_mixed / do_total_files * 100) if do_total_files > 0 else 0
-            
-            do_stats = [
-                {'Metric': 'Total DO Files', 'Count': do_total_files},
-                {'Metric': 'Total DO Conversions', 'Count': do_total_conversions},
-                {'Metric': 'Total DO Drop-Offs', 'Count': do_total_dropoffs},
-                {'Metric': 'Total DO Mixed', 'Count': do_total_mixed},
-                {'Metric': 'Average DO Conversion Rate (%)', 'Count': f"{do_avg_conversion_rate:.2f}%"},
-                {'Metric': 'Average DO Drop-Off Rate (%)', 'Count': f"{do_avg_dropoff_rate:.2f}%"},
-                {'Metric': 'Average DO Mixed Rate (%)', 'Count': f"{do_avg_mixed_rate:.2f}%"}
-            ]
-        
-        try:
-            with pd.ExcelWriter(overall_output, engine='openpyxl') as writer:
-                # Overall summary sheet
-                overall_df.to_excel(writer, sheet_name='Overall_Summary', index=False)
+    try:
+        # Subfolders are independent (each writes its own Excel file), so they run in
+        # separate processes; results come back in subfolder order (so the overall rows
+        # stay sorted), each one's console output printed as a block
+        workers = min(len(subfolders), os.cpu_count() or 1)
+        if workers <= 1:
+            for i, subfolder in enumerate(subfolders):
+                print(f"\nProcessing subfolder {i+1}/{len(subfolders)}: {subfolder.name}")
+                print("-" * 40)
                 
-                # CO statistics sheet
-                if not co_df.empty and co_stats:
-                    co_stats_df = pd.DataFrame(co_stats)
-                    co_stats_df.to_excel(writer, sheet_name='CO_Statistics', index=False)
+                # Create output file path for this subfolder
+                output_file = subfolder / f"Tag_analysis_results.{output_format}"
                 
-                # DO statistics sheet
-                if not do_df.empty and do_stats:
-                    do_stats_df = pd.DataFrame(do_stats)
-                    do_stats_df.to_excel(writer, sheet_name='DO_Statistics', index=False)
-            
+                success, summary = process_directory(str(subfolder), str(output_file), output_format=output_format)
+                collect(subfolder, success, summary)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                processed = executor.map(_process_subfolder, subfolders, [output_format] * len(subfolders))
+                for i, (subfolder, (success, summary, output)) in enumerate(zip(subfolders, processed)):
+                    print(f"\nProcessing subfolder {i+1}/{len(subfolders)}: {subfolder.name}")
+                    print("-" * 40)
+                    print(output, end='')
+                    collect(subfolder, success, summary)
+    finally:
+        # Also when the batch is aborted, so the rows written so far are a usable workbook
+        overall.close()
+    
+    # Report the overall summary
+    if overall.rows_written:
+        if overall.error is None:
             print(f"\n[OK] Overall summary saved to: {overall_output}")
             print("Excel file contains multiple sheets:")
             print("- 'Overall_Summary': All subfolders summary")
-            if not co_df.empty and co_stats:
+            if overall.co_stats:
                 print("- 'CO_Statistics': CO overall statistics")
-            if not do_df.empty and do_stats:
+            if overall.do_stats:
                 print("- 'DO_Statistics': DO overall statistics")
-        except Exception as e:
-            print(f"Warning: Could not create overall summary: {e}")
+        else:
+            print(f"Warning: Could not create overall summary: {overall.error}")
     
     print("\n" + "="*60)
     print("BATCH PROCESSING SUMMARY")
@@ -483,6 +568,8 @@ def main():
     parser = argparse.ArgumentParser(description='Batch Tag Analyzer - Process All Subfolders')
     parser.add_argument('--directory', '-d', help='Directory to analyze (single directory mode)')
     parser.add_argument('--parent', '-p', help='Parent directory to analyze all subfolders')
+    parser.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx',
+                        help='Format of the per-folder results (default: xlsx)')
     
     args = parser.parse_args()
     
@@ -493,7 +580,8 @@ def main():
         print(f"Directory: {args.directory}")
         print("-" * 60)
         
-        success = process_directory(args.directory, f"{args.directory}/Tag_analysis_results.xlsx")
+        success, _ = process_directory(args.directory, f"{args.directory}/Tag_analysis_results.{args.format}",
+                                       output_format=args.format)
         
         if success:
             print("\n" + "=" * 60)
@@ -510,16 +598,8 @@ def main():
         parent_folder = args.parent
     else:
         # Read settings from batch_tag_settings.txt
-        settings = {}
-        
         try:
-            with open("batch_tag_settings.txt", 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            settings[key.strip()] = value.strip()
+            settings = parse_kv_file("batch_tag_settings.txt")
         except FileNotFoundError:
             print("Error: No directory specified and batch_tag_settings.txt not found!")
             print("Please specify --directory or --parent, or create batch_tag_settings.txt")
@@ -538,7 +618,7 @@ def main():
     print("-" * 60)
     
     # Process all subfolders
-    success = batch_analyze_folders(parent_folder)
+    success = batch_analyze_folders(parent_folder, args.format)
     
     if success:
         print("\n" + "=" * 60)
@@ -4,24 +4,14 @@ Simple script to run the Tag Analyzer using tag_settings.txt
 """
 
 import os
-import subprocess
-import sys
 from pathlib import Path
+from _settings import parse_kv_file
+from tag_analyzer import process_directory
 
 def read_settings():
     """Read settings from tag_settings.txt file"""
-    settings = {}
-    
     try:
-        with open("tag_settings.txt", 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):  # Skip empty lines and comments
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        settings[key.strip()] = value.strip()
-        
-        return settings
+        return parse_kv_file("tag_settings.txt")
     except FileNotFoundError:
         print("Error: tag_settings.txt not found!")
         print("Please create tag_settings.txt with your settings")
@@ -60,22 +50,12 @@ def main():
     print(f"Tag Pattern: {tag_pattern}")
     print("-" * 30)
     
-    # Run the tag analyzer
+    # Run the tag analyzer (in this process, no second interpreter needed)
     try:
-        cmd = [
-            sys.executable, 
-            "tag_analyzer.py",
-            "--directory", input_folder,
-            "--output", output_file,
-            "--tag", tag_pattern
-        ]
-        
         print("Starting tag analysis...")
-        result = subprocess.run(cmd, check=True)
+        process_directory(input_folder, output_file)
         print("Tag analysis completed successfully!")
         
-    except subprocess.CalledProcessError as e:
-        print(f"Error running tag analyzer: {e}")
     except Exception as e:
         print(f"Unexpected error: {e}")
 
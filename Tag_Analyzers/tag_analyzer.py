@@ -9,7 +9,22 @@ import os
 import pandas as pd
 from pathlib import Path
 import argparse
-import re
+from concurrent.futures import ProcessPoolExecutor
+from _settings import parse_kv_file
+from _tags import CONVERSION_RE, DROPOFF_RE, find_tag, read_analysis_content
+
+# Faster Excel writer (optional, falls back to openpyxl)
+try:
+    import xlsxwriter
+    EXCEL_ENGINE = 'xlsxwriter'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# All tag_type values analyze_file_for_tag returns
+TAG_TYPES = ['Conversion', 'Drop-Off', 'Mixed', 'Unknown', 'None', 'Error']
+
+# Below this many files a process pool costs more to start than it saves
+PARALLEL_MIN_FILES = 256
 
 def analyze_file_for_tag(file_path):
     """
@@ -18,46 +33,22 @@ def analyze_file_for_tag(file_path):
     Returns a dictionary with classification and details.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split content by </think> to get the actual analysis result
-        parts = content.split('</think>')
-        if len(parts) > 1:
-            # Look for Tag: pattern in the analysis result (after </think>)
-            analysis_content = parts[1]
-        else:
-            # Fallback: look in the entire content for files without </think> separator
-            analysis_content = content
+        analysis_content = read_analysis_content(file_path)
         
         # Look for Tag: pattern (case insensitive) in the analysis content
-        # Enhanced pattern to catch various formats including reasons in brackets
-        tag_patterns = [
-            re.compile(r'Tag:\s*([^.\n]+?)(?:\s*\[.*?\])?', re.IGNORECASE),
-            re.compile(r'Tag\s*:\s*([^.\n]+?)(?:\s*\[.*?\])?', re.IGNORECASE),
-            re.compile(r'tag:\s*([^.\n]+?)(?:\s*\[.*?\])?', re.IGNORECASE),
-            re.compile(r'TAG:\s*([^.\n]+?)(?:\s*\[.*?\])?', re.IGNORECASE)
-        ]
-        
-        match = None
-        for pattern in tag_patterns:
-            match = pattern.search(analysis_content)
-            if match:
-                break
+        match = find_tag(analysis_content)
         
         if match:
-            tag_value = match.group(1).strip()
+            tag_value = match.group(match.lastindex).decode('utf-8', errors='replace').strip()
             
             # Enhanced classification with more variations
             tag_lower = tag_value.lower()
             
             # Check for conversion patterns
-            conversion_patterns = ['conversion', 'Conversion', 'convert', 'converted', 'success', 'completed']
-            is_conversion = any(pattern in tag_lower for pattern in conversion_patterns)
+            is_conversion = CONVERSION_RE.search(tag_lower) is not None
             
             # Check for drop-off patterns  
-            dropoff_patterns = ['drop-off', 'dropoff', 'drop off', 'drop_off', 'Drop-Off', 'abandon', 'abandoned', 'exit', 'left']
-            is_dropoff = any(pattern in tag_lower for pattern in dropoff_patterns)
+            is_dropoff = DROPOFF_RE.search(tag_lower) is not None
             
             if is_conversion and not is_dropoff:
                 return {
@@ -112,7 +103,7 @@ def analyze_file_for_tag(file_path):
             'is_dropoff': False
         }
 
-def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
+def process_directory(directory_path, output_file="tag_analysis_results.xlsx", parallel=True):
     """
     Process all files in a directory and create Excel results with detailed analysis
     """
@@ -122,8 +113,13 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
         print(f"Error: Directory '{directory_path}' does not exist!")
         return
     
-    # Get all text files in the directory that start with DO or CO
-    files = [f for f in directory.iterdir() if f.is_file() and f.suffix.lower() in ['.txt', '.text'] and (f.name.startswith('DO') or f.name.startswith('CO'))]
+    # Get all text files in the directory that start with DO or CO (name checks first,
+    # so only candidates need is_file(), which scandir usually answers without a stat)
+    with os.scandir(directory) as entries:
+        files = [e.path for e in entries
+                 if e.name.startswith(('DO', 'CO'))
+                 and e.name.lower().endswith(('.txt', '.text'))
+                 and e.is_file()]
     
     if not files:
         print(f"No DO/CO files found in '{directory_path}'")
@@ -133,7 +129,9 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
     print("Looking for Tag: patterns (Conversion/Drop-Off)")
     print("-" * 60)
     
-    results = []
+    # Detailed results as two plain columns (no dict per row)
+    filenames = []
+    tag_types = []
     conversion_count = 0
     dropoff_count = 0
     mixed_count = 0
@@ -141,9 +139,16 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
     no_tag_count = 0
     error_count = 0
     
-    for file_path in files:
-        filename = file_path.name
-        analysis = analyze_file_for_tag(file_path)
+    # Files are independent, so large folders are analyzed across processes
+    # (map keeps file order, so the report below is the same either way)
+    if parallel and len(files) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            analyses = list(executor.map(analyze_file_for_tag, files, chunksize=32))
+    else:
+        analyses = [analyze_file_for_tag(file_path) for file_path in files]
+    
+    for file_path, analysis in zip(files, analyses):
+        filename = os.path.basename(file_path)
         
         # Count different types
         if analysis['tag_type'] == 'Mixed':
@@ -159,10 +164,8 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
         else:
             no_tag_count += 1
         
-        results.append({
-            'Filename': filename,
-            'Tag_Type': analysis['tag_type']
-        })
+        filenames.append(filename)
+        tag_types.append(analysis['tag_type'])
         
         # Display status
         status_icon = "[OK]" if analysis['has_tag'] else "[NO]"
@@ -179,8 +182,11 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
     error_percentage = (error_count / total_files) * 100 if total_files > 0 else 0
     
     
-    # Create DataFrame
-    df = pd.DataFrame(results)
+    # Create DataFrame (Tag_Type has only a handful of distinct values, so it is categorical)
+    df = pd.DataFrame({
+        'Filename': filenames,
+        'Tag_Type': pd.Categorical(tag_types, categories=TAG_TYPES)
+    })
     
     # Create summary data
     summary_data = {
@@ -224,7 +230,8 @@ def process_directory(directory_path, output_file="tag_analysis_results.xlsx"):
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        # No constant_memory: to_excel writes column by column, which that mode cannot take
+        with pd.ExcelWriter(output_file, engine=EXCEL_ENGINE) as writer:
             # Write detailed results
             df.to_excel(writer, sheet_name='Detailed_Results', index=False)
             # Write summary statistics
@@ -266,15 +273,8 @@ def main():
     
     # If no directory specified via command line, try to read from settings file
     if not args.directory:
-        settings = {}
         try:
-            with open("tag_settings.txt", 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            settings[key.strip()] = value.strip()
+            settings = parse_kv_file("tag_settings.txt")
         except FileNotFoundError:
             print("Error: No directory specified and tag_settings.txt not found!")
             print("Please specify --directory or create tag_settings.txt")